@@ -1,14 +1,16 @@
 # backend/app.py
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 import time
 import os
+import asyncio
 import pandas as pd
 from datetime import datetime
 from data_loader import data_loader
+from services.row_cache import canonical_review, dumps
 
 app = FastAPI(
     title="Flipkart Reviews API",
@@ -25,12 +27,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Global variables for cold start handling
 app_start_time = time.time()
 is_warm = False
 
+# Serve /reviews and /search from pre-serialized row JSON (set FAST_JSON=false to disable)
+FAST_JSON = os.environ.get("FAST_JSON", "true").lower() != "false"
+
 # Pydantic models (compatible with pydantic 1.x)
 class Review(BaseModel):
     review_id: int = Field(..., description="Review ID")
@@ -63,6 +69,23 @@ class StatsResponse(BaseModel):
     ratings: Dict[str, int]
     verified_reviews: int
 
+async def wait_for_data():
+    """Await the shared dataset load (started once, never run on the event loop)"""
+    if not data_loader.loaded:
+        await asyncio.wrap_future(data_loader.start_loading())
+
+async def wait_for_search_index(query: str, rank: Optional[str] = None):
+    """Await the background search index build when only it can answer the query"""
+    pending = data_loader.pending_index(query, rank)
+    while pending is not None:
+        await asyncio.wrap_future(pending)
+        # A reload may have started another build meanwhile
+        pending = data_loader.pending_index(query, rank)
+
+def review_from_record(item: Dict) -> Review:
+    """Build a Review model from a DataFrame record"""
+    return Review(**canonical_review(item))
+
 def show_loading_page():
     """Show loading page during cold start"""
     html_content = """
@@ -227,9 +250,8 @@ async def root():
     # Mark as warm after first successful load
     is_warm = True
     
-    # Load data if not loaded
-    if not data_loader.loaded:
-        data_loader.load_data()
+    # Wait for the shared dataset load
+    await wait_for_data()
     
     # Show API info page
     html_content = f"""
@@ -472,18 +494,21 @@ async def health_check():
     is_warm = True
     
     try:
-        # Try to load data to verify everything works
-        if not data_loader.loaded:
-            data_loader.load_data()
+        # Kick off the shared load without waiting for it
+        data_loader.start_loading()
         
         loaded = data_loader.loaded
-        review_count = len(data_loader.df) if loaded else 0
+        review_count = data_loader.review_count if loaded else 0
         
         return {
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
             "dataset_loaded": loaded,
+            "load_phase": data_loader.load_phase,
             "reviews_count": review_count,
+            "load_metrics": data_loader.last_load_metrics,
+            "search_backend": data_loader.search_backend,
+            "search_cache": data_loader.search_cache.stats(),
             "service": "Flipkart Reviews API",
             "version": "2.0.0",
             "uptime": time.time() - app_start_time
@@ -498,29 +523,29 @@ async def health_check():
 
 @app.get("/reviews", response_model=List[Review])
 async def get_reviews(
+    response: Response,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     category: Optional[str] = None,
     product: Optional[str] = None,
     min_rating: Optional[int] = Query(None, ge=1, le=5),
     max_rating: Optional[int] = Query(None, ge=1, le=5),
-    verified: Optional[bool] = None
+    verified: Optional[bool] = None,
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor (overrides page)")
 ):
     """Get reviews with filtering"""
     # Mark service as warm
     global is_warm
     is_warm = True
     
-    # Load data if not loaded
-    if not data_loader.loaded:
-        data_loader.load_data()
+    # Wait for the shared dataset load
+    await wait_for_data()
     
-    if data_loader.df is None or data_loader.df.empty:
+    if not data_loader.review_count:
         raise HTTPException(status_code=404, detail="Dataset not loaded")
     
     # Calculate pagination
     start_idx = (page - 1) * limit
-    end_idx = start_idx + limit
     
     # Get filtered data
     filters = {
@@ -534,33 +559,90 @@ async def get_reviews(
     # Remove None filters
     filters = {k: v for k, v in filters.items() if v is not None}
     
-    # Get all filtered data
-    all_reviews = data_loader.get_reviews(**filters)
+    # Fast path: concatenate the cached JSON of the requested rows
+    if FAST_JSON:
+        try:
+            body, next_cursor = data_loader.get_reviews_page_json(
+                limit=limit, offset=start_idx, cursor=cursor, **filters
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return Response(content=body, media_type="application/json", headers=headers)
+    
+    # Get only the requested page from the data layer
+    try:
+        paginated_reviews, next_cursor = data_loader.get_reviews_page(
+            limit=limit, offset=start_idx, cursor=cursor, **filters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Apply pagination
-    paginated_reviews = all_reviews[start_idx:end_idx]
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     # Convert to Review models
     reviews = []
     for item in paginated_reviews:
         try:
-            review = Review(
-                review_id=int(item.get('review_id', 0)),
-                category=str(item.get('category', 'Unknown')),
-                product_name=str(item.get('product_name', 'Unknown')),
-                rating=int(item.get('rating', 0)),
-                review_text=str(item.get('review_text', '')),
-                reviewer=str(item.get('reviewer', 'Customer')),
-                date=str(item.get('date', '')) if item.get('date') else None,
-                verified=str(item.get('verified', 'No'))
-            )
-            reviews.append(review)
+            reviews.append(review_from_record(item))
         except (ValueError, KeyError) as e:
             print(f"Error converting review: {e}")
             continue
     
     return reviews
 
+@app.get("/reviews/batch", response_model=List[Review])
+async def get_reviews_batch(ids: List[int] = Query(..., max_length=100)):
+    """Get several reviews by ID in one call (unknown IDs are skipped)"""
+    # Mark service as warm
+    global is_warm
+    is_warm = True
+    
+    await wait_for_data()
+    
+    if not data_loader.review_count:
+        raise HTTPException(status_code=404, detail="Dataset not loaded")
+    
+    reviews = []
+    for item in data_loader.get_reviews_by_ids(ids):
+        try:
+            reviews.append(review_from_record(item))
+        except (ValueError, KeyError, TypeError) as e:
+            # Documents loaded straight from MongoDB skip _clean_data (e.g. a null rating)
+            print(f"Error converting review: {e}")
+            continue
+    
+    return reviews
+
+@app.get("/reviews/recent", response_model=List[Review])
+async def get_recent_reviews(
+    limit: int = Query(10, ge=1, le=100),
+    product: Optional[str] = Query(None, description="Exact product name (case-insensitive)"),
+    category: Optional[str] = Query(None, description="Exact category name (case-insensitive)")
+):
+    """Most recent reviews by scraped date, overall or for one product / category"""
+    # Mark service as warm
+    global is_warm
+    is_warm = True
+
+    await wait_for_data()
+
+    if not data_loader.review_count:
+        raise HTTPException(status_code=404, detail="Dataset not loaded")
+
+    reviews = []
+    for item in data_loader.get_recent_reviews(limit, product=product, category=category):
+        try:
+            reviews.append(review_from_record(item))
+        except (ValueError, KeyError, TypeError) as e:
+            # Documents loaded straight from MongoDB skip _clean_data (e.g. a null rating)
+            print(f"Error converting review: {e}")
+            continue
+
+    return reviews
+
 @app.get("/reviews/{review_id}", response_model=Review)
 async def get_review(review_id: int):
     """Get a specific review"""
@@ -568,30 +650,18 @@ async def get_review(review_id: int):
     global is_warm
     is_warm = True
     
-    if not data_loader.loaded:
-        data_loader.load_data()
+    await wait_for_data()
     
-    if data_loader.df is None or data_loader.df.empty:
+    if not data_loader.review_count:
         raise HTTPException(status_code=404, detail="Dataset not loaded")
     
-    # Find review by ID
-    review_df = data_loader.df[data_loader.df['review_id'] == review_id]
+    # Find review by ID (hash index lookup)
+    item = data_loader.get_review_by_id(review_id)
     
-    if review_df.empty:
+    if item is None:
         raise HTTPException(status_code=404, detail="Review not found")
     
-    item = review_df.iloc[0].to_dict()
-    
-    return Review(
-        review_id=int(item.get('review_id', 0)),
-        category=str(item.get('category', 'Unknown')),
-        product_name=str(item.get('product_name', 'Unknown')),
-        rating=int(item.get('rating', 0)),
-        review_text=str(item.get('review_text', '')),
-        reviewer=str(item.get('reviewer', 'Customer')),
-        date=str(item.get('date', '')) if item.get('date') else None,
-        verified=str(item.get('verified', 'No'))
-    )
+    return review_from_record(item)
 
 @app.get("/stats", response_model=StatsResponse)
 async def get_stats():
@@ -600,8 +670,7 @@ async def get_stats():
     global is_warm
     is_warm = True
     
-    if not data_loader.loaded:
-        data_loader.load_data()
+    await wait_for_data()
     
     stats = data_loader.get_stats()
     
@@ -623,16 +692,13 @@ async def get_products():
     global is_warm
     is_warm = True
     
-    if not data_loader.loaded:
-        data_loader.load_data()
+    await wait_for_data()
     
-    if data_loader.df is None or data_loader.df.empty:
+    if not data_loader.review_count:
         raise HTTPException(status_code=404, detail="Dataset not loaded")
     
-    if 'product_name' not in data_loader.df.columns:
-        return {"products": [], "count": 0}
-    
-    products = data_loader.df['product_name'].unique().tolist()
+    # Distinct names in first-appearance order, tracked by the aggregate cube
+    products = [name for name in data_loader.cube.product_category if name is not None]
     
     return {
         "products": products,
@@ -646,16 +712,12 @@ async def get_categories():
     global is_warm
     is_warm = True
     
-    if not data_loader.loaded:
-        data_loader.load_data()
+    await wait_for_data()
     
-    if data_loader.df is None or data_loader.df.empty:
+    if not data_loader.review_count:
         raise HTTPException(status_code=404, detail="Dataset not loaded")
     
-    if 'category' not in data_loader.df.columns:
-        return {"categories": [], "count": 0}
-    
-    categories = data_loader.df['category'].unique().tolist()
+    categories = [name for name in data_loader.cube.by_category() if name is not None]
     
     return {
         "categories": categories,
@@ -664,15 +726,42 @@ async def get_categories():
 
 @app.get("/search")
 async def search_reviews(
-    query: str = Query(..., min_length=2),
-    limit: int = Query(20, ge=1, le=100)
+    query: str = Query(
+        ..., min_length=2,
+        description='Text to find; supports "quoted phrases", AND/OR/NOT and product:/reviewer:/category:/text: scoping'
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    rank: Optional[str] = Query(None, pattern="^bm25$", description="Set to bm25 for relevance ranking"),
+    snippet: bool = Query(False, description="Return a highlighted review_text window instead of the full text"),
+    snippet_length: int = Query(160, ge=40, le=1000)
 ):
     """Search reviews by text"""
     # Mark service as warm
     global is_warm
     is_warm = True
     
-    results = data_loader.search_reviews(query, limit)
+    await wait_for_data()
+    await wait_for_search_index(query, rank)
+    
+    if snippet:
+        results = data_loader.search_snippets(query, limit, rank, snippet_length)
+        return {
+            "query": query,
+            "results": results,
+            "count": len(results)
+        }
+    
+    # Fast path: splice the cached JSON fragments into the response envelope
+    if FAST_JSON:
+        fragments = data_loader.search_reviews_json(query, limit, rank)
+        body = (
+            b'{"query":' + dumps(query) +
+            b',"results":[' + b",".join(fragments) +
+            b'],"count":' + str(len(fragments)).encode() + b"}"
+        )
+        return Response(content=body, media_type="application/json")
+    
+    results = data_loader.search_reviews(query, limit, rank)
     
     formatted_results = []
     for item in results:
@@ -691,6 +780,26 @@ async def search_reviews(
         "count": len(formatted_results)
     }
 
+@app.get("/suggest")
+async def suggest(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20)
+):
+    """Autocomplete product names, categories and keywords by prefix"""
+    # Mark service as warm
+    global is_warm
+    is_warm = True
+    
+    await wait_for_data()
+    
+    suggestions = data_loader.suggest(prefix, limit)
+    
+    return {
+        "prefix": prefix,
+        "suggestions": suggestions,
+        "count": len(suggestions)
+    }
+
 # Pre-load data when app starts (but don't block startup)
 @app.on_event("startup")
 async def startup_event():
@@ -698,18 +807,8 @@ async def startup_event():
     global app_start_time
     app_start_time = time.time()
     
-    # Load data in background to avoid blocking startup
-    import threading
-    def load_data_background():
-        try:
-            data_loader.load_data()
-            print(f"✅ Dataset loaded successfully: {len(data_loader.df)} reviews")
-        except Exception as e:
-            print(f"❌ Error loading dataset: {e}")
-    
-    thread = threading.Thread(target=load_data_background)
-    thread.daemon = True
-    thread.start()
+    # Start the shared background load (handlers await the same future)
+    data_loader.start_loading()
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,30 +1,200 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
 import os
+import json
+import base64
+import threading
+import time
+from array import array
+from concurrent.futures import Future
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from textblob import TextBlob  # for sentiment analysis
+from services.review_index import ReviewIndex
+from services.row_cache import RowJsonCache, canonical_review
+from services.search_index import SearchIndex, token_spans, tokenize
+from services.suggest_index import SuggestIndex
+from services.aggregate_cube import AggregateCube, ranked
+from services.frame_store import FrameStore
+from services.recency_index import RecencyIndex
+from services.result_cache import ResultCache
+from services.snippets import make_snippet
+from services.mongo_search import MongoTextSearch
+from services.query_parser import is_structured, parse_query, positive_terms
+from services.text_normalize import (
+    add_normalized_columns, normalize_text, normalized_values, without_normalized_columns
+)
+from product_list import get_all_keywords
+from services.snapshot import DatasetSnapshot
+from services.review_dates import normalize_review_date, normalize_review_dates
+
+# Fields pulled from MongoDB: everything the API and analytics read
+MONGO_FIELDS = [
+    "review_id", "category", "product_name", "rating", "review_text",
+    "reviewer", "date", "verified", "product_url", "scraped_date",
+    "scrape_phase", "source_file", "sentiment_polarity",
+    "sentiment_subjectivity", "sentiment_label"
+]
+MONGO_BATCH_SIZE = int(os.environ.get("MONGO_BATCH_SIZE", "5000"))
+
+# Search result cache sizing (entries, seconds)
+SEARCH_CACHE_SIZE = int(os.environ.get("SEARCH_CACHE_SIZE", "256"))
+SEARCH_CACHE_TTL = float(os.environ.get("SEARCH_CACHE_TTL", "300"))
+
+# At this many reviews, search is pushed down to MongoDB's text index instead of
+# holding the in-memory positional index. Sized by the build's peak, not what it
+# keeps: measured SearchIndex cost is ~1.5 KB per review at peak while building,
+# ~0.95 KB retained and ~0.1 ms per review, i.e. a ~75 MB peak (~48 MB kept) and
+# ~5 s at the default, next to the frame itself on a 512 MB instance.
+SEARCH_PUSHDOWN_THRESHOLD = int(os.environ.get("SEARCH_PUSHDOWN_THRESHOLD", "50000"))
+
+# Numeric fields buffered as typed arrays instead of lists of Python objects
+TYPED_FIELDS = {
+    "review_id": "q",
+    "rating": "q",
+    "sentiment_polarity": "d",
+    "sentiment_subjectivity": "d",
+}
+
+
+def _encode_cursor(review_id: int, position: int) -> str:
+    """Opaque pagination cursor: last review_id plus its sort key (frame position)"""
+    payload = json.dumps({"id": int(review_id), "pos": int(position)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, int]:
+    """Decode a cursor produced by _encode_cursor (raises ValueError if malformed)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(payload["id"]), int(payload["pos"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+@dataclass
+class DatasetState:
+    """One loaded frame and everything derived from it, swapped in with a single assignment.
+
+    Readers take `state = self.state` once and use only that object, so a
+    reload never shows them a frame from one load and an index from another.
+    Appends patch the current state in place under the loader's append lock.
+    The row cache and search index are built after the state starts serving
+    and stay None until then.
+    """
+    store: FrameStore = field(default_factory=FrameStore)
+    index: ReviewIndex = field(default_factory=ReviewIndex)
+    suggest_index: SuggestIndex = field(default_factory=SuggestIndex)
+    cube: AggregateCube = field(default_factory=AggregateCube)
+    recency: RecencyIndex = field(default_factory=RecencyIndex)
+    row_cache: Optional[RowJsonCache] = None
+    search_index: Optional[SearchIndex] = None
+    # "memory" (SearchIndex) or "mongo" ($text pushdown), chosen per load by size
+    search_backend: str = "memory"
+    # Bumped whenever the dataset changes; derived caches key on it
+    generation: int = 0
+    # Rows in the frame as installed, and (row, recency timestamp) for every row appended since
+    base_rows: int = 0
+    appended: List[Tuple[Dict[str, Any], Any]] = field(default_factory=list)
+    # Resolved once the deferred indexes are built (or given up on)
+    indexed: Future = field(default_factory=Future)
 
 
 class DataLoader:
     """Data loader for Flipkart reviews dataset with MongoDB support"""
 
     def __init__(self):
-        self.df = None
+        self.state = DatasetState(row_cache=RowJsonCache(), search_index=SearchIndex())
+        self.state.indexed.set_result(None)
+        # Serializes appends, reload swaps and the deferred-index catch-up
+        self._append_lock = threading.Lock()
         self.loaded = False
         self.csv_path = None
         self.mongo_client = None
         self.db = None
         self.collection = None
-        
-        # Initialize MongoDB connection with YOUR URL
-        self._init_mongodb()
+        self.mongo_search: Optional[MongoTextSearch] = None
+        self._stats_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+        # Search hit positions; keys carry the generation, so stale entries never match
+        self.search_cache = ResultCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
+        self.last_load_metrics: Dict[str, Any] = {}
+        self.snapshot = DatasetSnapshot()
+        self._snapshot_fingerprint: Optional[Dict[str, Any]] = None
+
+        # Single-flight loading: one load in flight, every caller waits on it
+        self._load_lock = threading.Lock()
+        self._load_future: Optional[Future] = None
+        self._mongo_attempted = False
+        # Set once the MongoDB connection attempt has finished (either way)
+        self._mongo_checked = threading.Event()
+        # idle -> connecting -> fetching -> cleaning -> indexing -> ready
+        self.load_phase = "idle"
+
+    # -------------------------------------------------------------
+    # In-memory frame
+    # -------------------------------------------------------------
+    @property
+    def df(self) -> Optional[pd.DataFrame]:
+        """The whole review frame, including rows added since the last read"""
+        return self.state.store.frame()
+
+    @property
+    def review_count(self) -> int:
+        """Rows in the current dataset, without materializing the frame"""
+        return len(self.state.store)
+
+    # Shortcuts into the current state
+    @property
+    def index(self) -> ReviewIndex:
+        return self.state.index
+
+    @property
+    def row_cache(self) -> Optional[RowJsonCache]:
+        return self.state.row_cache
+
+    @property
+    def search_index(self) -> Optional[SearchIndex]:
+        return self.state.search_index
+
+    @property
+    def suggest_index(self) -> SuggestIndex:
+        return self.state.suggest_index
+
+    @property
+    def cube(self) -> AggregateCube:
+        return self.state.cube
+
+    @property
+    def recency(self) -> RecencyIndex:
+        return self.state.recency
+
+    @property
+    def search_backend(self) -> str:
+        return self.state.search_backend
+
+    @property
+    def generation(self) -> int:
+        return self.state.generation
 
     # -------------------------------------------------------------
     # MongoDB Initialization
     # -------------------------------------------------------------
+    def _connect_mongodb(self):
+        """Connect once; done lazily by the loader so importing this module never blocks"""
+        self.load_phase = "connecting"
+        if not self._mongo_attempted:
+            self._mongo_attempted = True
+            try:
+                # Initialize MongoDB connection with YOUR URL
+                self._init_mongodb()
+            finally:
+                self._mongo_checked.set()
+
     def _init_mongodb(self):
         """Initialize MongoDB connection with your Atlas URL"""
         # Try environment variable first
@@ -125,8 +295,8 @@ class DataLoader:
             return
         
         try:
-            # Convert DataFrame to list of dictionaries
-            records = self.df.to_dict("records")
+            # Convert DataFrame to list of dictionaries (shadow columns stay local)
+            records = without_normalized_columns(self.df).to_dict("records")
             
             # Add metadata and sentiment analysis
             for record in records:
@@ -175,37 +345,121 @@ class DataLoader:
                 print("📭 MongoDB collection is empty")
                 return False
             
-            # Load data from MongoDB
-            cursor = self.collection.find({}, {"_id": 0})
-            data = list(cursor)
+            # Stream projected batches straight into column buffers, so the
+            # full list of documents is never held in memory at once
+            started = time.perf_counter()
+            columns = self._read_mongo_columns()
             
-            if not data:
+            if not columns:
                 return False
             
             # Convert to DataFrame
-            self.df = pd.DataFrame(data)
+            df = pd.DataFrame({
+                field: np.frombuffer(buffer, dtype=buffer.typecode) if isinstance(buffer, array) else buffer
+                for field, buffer in columns.items()
+            })
+            
+            elapsed = time.perf_counter() - started
+            self.last_load_metrics = {
+                "source": "mongodb",
+                "documents": len(df),
+                "seconds": round(elapsed, 3),
+                "docs_per_sec": round(len(df) / elapsed, 1) if elapsed > 0 else None,
+                "batch_size": MONGO_BATCH_SIZE
+            }
+            print(f"⚡ Streamed {len(df)} documents in {elapsed:.2f}s "
+                  f"({self.last_load_metrics['docs_per_sec']} docs/sec)")
             
-            # Convert date strings to datetime if needed
-            if "date" in self.df.columns:
-                self.df["date"] = pd.to_datetime(self.df["date"], errors="coerce")
+            # Normalize free-text dates (older documents may hold the raw scraped text)
+            if "date" in df.columns:
+                df["date"] = normalize_review_dates(df["date"], df.get("scraped_date"))
             
-            print(f"📊 Loaded {len(self.df)} reviews from MongoDB")
+            self._install_frame(df)
+            print(f"📊 Loaded {len(df)} reviews from MongoDB")
             return True
             
         except Exception as e:
             print(f"❌ Error loading from MongoDB: {e}")
             return False
 
+    def _read_mongo_columns(self) -> Dict[str, Any]:
+        """Read the collection in fixed-size cursor batches into per-field buffers"""
+        projection = {field: 1 for field in MONGO_FIELDS}
+        projection["_id"] = 0
+
+        columns: Dict[str, Any] = {
+            field: array(TYPED_FIELDS[field]) if field in TYPED_FIELDS else []
+            for field in MONGO_FIELDS
+        }
+        present = set()
+
+        cursor = self.collection.find({}, projection, batch_size=MONGO_BATCH_SIZE)
+        for doc in cursor:
+            present.update(doc.keys())
+            for field in MONGO_FIELDS:
+                value = doc.get(field)
+                buffer = columns[field]
+                try:
+                    buffer.append(value)
+                except (TypeError, OverflowError):
+                    # Missing or non-numeric value: fall back to an object column
+                    buffer = columns[field] = list(buffer)
+                    buffer.append(value)
+
+        # Drop fields that no document carries
+        return {field: buffer for field, buffer in columns.items() if field in present}
+
     # -------------------------------------------------------------
     # Load dataset
     # -------------------------------------------------------------
     def load_data(self) -> pd.DataFrame:
+        """Load the dataset once; concurrent callers wait for the same load"""
+        self.start_loading().result()
+        return self.df
+
+    def start_loading(self) -> Future:
+        """Start the load if none has been started and return its shared future"""
+        with self._load_lock:
+            if self._load_future is None:
+                future = Future()
+                self._load_future = future
+                thread = threading.Thread(target=self._run_load, args=(future,), daemon=True)
+                thread.start()
+            return self._load_future
+
+    def _run_load(self, future: Future):
+        try:
+            future.set_result(self._load_dataset())
+        except Exception as e:
+            print(f"❌ Error loading dataset: {e}")
+            self.load_phase = "failed"
+            with self._load_lock:
+                # Let the next caller retry
+                self._load_future = None
+            future.set_exception(e)
+
+    def _load_dataset(self) -> pd.DataFrame:
+        """Serve the local snapshot if there is one, otherwise load from MongoDB/CSV"""
+        if self._load_from_snapshot():
+            self.load_phase = "ready"
+            self.loaded = True
+            self._start_revalidation()
+            return self.df
+
+        self._connect_mongodb()
+        return self._load_from_source()
+
+    def _load_from_source(self) -> pd.DataFrame:
         """Load data from MongoDB first, fallback to CSV"""
         try:
+            self.load_phase = "fetching"
+
             # Try to load from MongoDB first
             if self._load_from_mongodb():
+                self.load_phase = "ready"
                 self.loaded = True
                 print("✅ Using data from MongoDB")
+                self._save_snapshot()
                 return self.df
             
             # Fallback to CSV
@@ -213,10 +467,11 @@ class DataLoader:
 
             if not dataset_path:
                 print("❌ No dataset found. Creating empty dataset.")
-                self.df = pd.DataFrame(columns=[
+                self._install_frame(pd.DataFrame(columns=[
                     "review_id", "category", "product_name", "rating",
                     "review_text", "reviewer", "date", "verified"
-                ])
+                ]))
+                self.load_phase = "ready"
                 self.loaded = True
                 return self.df
 
@@ -224,19 +479,23 @@ class DataLoader:
             print(f"📊 Loading dataset from CSV: {dataset_path}")
             
             # Load CSV
-            self.df = pd.read_csv(dataset_path, encoding="utf-8-sig")
-            print(f"📈 Dataset shape: {self.df.shape}")
-            print(f"📋 Columns: {list(self.df.columns)}")
+            df = pd.read_csv(dataset_path, encoding="utf-8-sig")
+            print(f"📈 Dataset shape: {df.shape}")
+            print(f"📋 Columns: {list(df.columns)}")
 
             # Clean data
-            self._clean_data()
+            self.load_phase = "cleaning"
+            df = self._clean_data(df)
+            self._install_frame(df)
             
             # Save to MongoDB for future use
             self._save_to_mongodb()
             
             print(f"✅ Successfully loaded {len(self.df)} reviews")
 
+            self.load_phase = "ready"
             self.loaded = True
+            self._save_snapshot()
             return self.df
 
         except Exception as e:
@@ -244,69 +503,226 @@ class DataLoader:
             import traceback
             traceback.print_exc()
 
-            self.df = pd.DataFrame(columns=[
+            self._install_frame(pd.DataFrame(columns=[
                 "review_id", "category", "product_name", "rating",
                 "review_text", "reviewer", "date", "verified"
-            ])
+            ]))
+            self.load_phase = "ready"
             self.loaded = True
             return self.df
 
+    # -------------------------------------------------------------
+    # Local snapshot (warm restarts)
+    # -------------------------------------------------------------
+    def _source_fingerprint(self) -> Dict[str, Any]:
+        """Cheap identity of the current source: Mongo count + max updated_at, or CSV mtime/size"""
+        if self.collection is not None:
+            latest = list(
+                self.collection.find({}, {"updated_at": 1, "_id": 0})
+                .sort("updated_at", -1)
+                .limit(1)
+            )
+            return {
+                "source": "mongodb",
+                "count": self.collection.count_documents({}),
+                "max_updated_at": str(latest[0].get("updated_at")) if latest else None
+            }
+
+        dataset_path = self._find_dataset()
+        if dataset_path is None:
+            return {"source": "none"}
+        stat = dataset_path.stat()
+        return {
+            "source": "csv",
+            "path": str(dataset_path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size
+        }
+
+    def _load_from_snapshot(self) -> bool:
+        self.load_phase = "fetching"
+        snapshot = self.snapshot.load()
+        if snapshot is None:
+            return False
+
+        df, meta = snapshot
+        self._snapshot_fingerprint = meta.get("fingerprint")
+        self.csv_path = meta.get("csv_path")
+        self._install_frame(df)
+        print(f"💽 Loaded {len(df)} reviews from snapshot saved at {meta.get('saved_at')}")
+        return True
+
+    def _save_snapshot(self):
+        if not self.snapshot.enabled:
+            return
+        try:
+            fingerprint = self._source_fingerprint()
+        except Exception as e:
+            print(f"⚠️ Could not fingerprint dataset source: {e}")
+            return
+        if self.snapshot.save(self.df, fingerprint, csv_path=self.csv_path):
+            self._snapshot_fingerprint = fingerprint
+
+    def _start_revalidation(self):
+        """Check the snapshot against its source in the background and reload if stale"""
+        def revalidate():
+            try:
+                self._connect_mongodb()
+                current = self._source_fingerprint()
+                if current == self._snapshot_fingerprint:
+                    print("✅ Snapshot is up to date")
+                    return
+                print("🔄 Snapshot is stale, reloading from source")
+                self._load_from_source()
+            except Exception as e:
+                print(f"⚠️ Snapshot revalidation failed: {e}")
+            finally:
+                self.load_phase = "ready"
+
+        thread = threading.Thread(target=revalidate, daemon=True)
+        thread.start()
+
+    # -------------------------------------------------------------
+    # Secondary indexes
+    # -------------------------------------------------------------
+    def _install_frame(self, df: pd.DataFrame):
+        """Index a new frame and swap it in as one state; the slow indexes follow in the background"""
+        self.load_phase = "indexing"
+        # Casefolded shadow columns, so matchers never lowercase per request
+        df = add_normalized_columns(df)
+        index = ReviewIndex()
+        index.build(df)
+        suggest_index = SuggestIndex()
+        suggest_index.build(df, [keyword for _, keyword in get_all_keywords()])
+        pushdown = len(df) >= SEARCH_PUSHDOWN_THRESHOLD and self._enable_pushdown()
+        state = DatasetState(
+            store=FrameStore(df),
+            index=index,
+            suggest_index=suggest_index,
+            cube=AggregateCube.from_frame(df),
+            recency=RecencyIndex.from_frame(df),
+            search_backend="mongo" if pushdown else "memory",
+            base_rows=len(df)
+        )
+
+        with self._append_lock:
+            previous = self.state
+            state.generation = previous.generation + 1
+            # Reviews added while this frame was being read are not in it yet
+            for row, timestamp in previous.appended:
+                if int(row["review_id"]) not in index.id_positions:
+                    self._apply_append(state, row, timestamp)
+            self.state = state
+
+        thread = threading.Thread(target=self._build_deferred_indexes, args=(state, df), daemon=True)
+        thread.start()
+
+    def _build_deferred_indexes(self, state: DatasetState, df: pd.DataFrame):
+        """Build the row cache and search index off the serving path, then swap in a state holding them"""
+        try:
+            started = time.perf_counter()
+            row_cache = RowJsonCache()
+            row_cache.build(df)
+            search_backend = state.search_backend
+            if search_backend == "memory" and len(df) >= SEARCH_PUSHDOWN_THRESHOLD:
+                # A snapshot is installed before MongoDB connects: settle the backend first
+                self._mongo_checked.wait()
+                if self._enable_pushdown():
+                    search_backend = "mongo"
+            search_index = None
+            if search_backend == "memory":
+                search_index = SearchIndex()
+                search_index.build(df)
+
+            with self._append_lock:
+                if self.state is not state:
+                    # Superseded by a newer load
+                    return
+                # Catch up on rows appended while building
+                for offset, (row, _) in enumerate(state.appended):
+                    row_cache.append(row)
+                    if search_index is not None:
+                        search_index.add_row(state.base_rows + offset, row)
+                self.state = replace(
+                    state, row_cache=row_cache, search_index=search_index, search_backend=search_backend
+                )
+            print(f"🗂️ Row cache and {search_backend} search ready in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            print(f"⚠️ Could not build search index / row cache: {e}")
+        finally:
+            state.indexed.set_result(None)
+
     # -------------------------------------------------------------
     # Clean dataset
     # -------------------------------------------------------------
-    def _clean_data(self):
+    def _enable_pushdown(self) -> bool:
+        """Prepare the MongoDB text index so search can run there instead of in memory"""
+        if self.collection is None:
+            return False
+        try:
+            mongo_search = MongoTextSearch(self.collection)
+            mongo_search.ensure_index()
+        except Exception as e:
+            print(f"⚠️ Text index unavailable, keeping in-memory search: {e}")
+            return False
+        self.mongo_search = mongo_search
+        print("🔎 Search pushed down to the MongoDB text index")
+        return True
+
+    def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and normalize dataset"""
-        if self.df is None or self.df.empty:
-            return
+        if df is None or df.empty:
+            return df
 
         # Fix review_id issue
-        if "review_id" in self.df.columns:
-            self.df["review_id"] = pd.to_numeric(
-                self.df["review_id"], errors="coerce"
+        if "review_id" in df.columns:
+            df["review_id"] = pd.to_numeric(
+                df["review_id"], errors="coerce"
             )
 
-            missing_mask = self.df["review_id"].isna()
+            missing_mask = df["review_id"].isna()
             if missing_mask.any():
                 start_id = 1
-                if not self.df["review_id"].isna().all():
-                    existing_ids = self.df["review_id"].dropna()
+                if not df["review_id"].isna().all():
+                    existing_ids = df["review_id"].dropna()
                     if len(existing_ids) > 0:
                         start_id = int(existing_ids.max()) + 1
                 
                 fill_ids = list(range(start_id, start_id + missing_mask.sum()))
-                self.df.loc[missing_mask, "review_id"] = fill_ids
+                df.loc[missing_mask, "review_id"] = fill_ids
 
-            self.df["review_id"] = self.df["review_id"].astype(int)
+            df["review_id"] = df["review_id"].astype(int)
         else:
-            self.df.insert(0, "review_id", list(range(1, len(self.df) + 1)))
+            df.insert(0, "review_id", list(range(1, len(df) + 1)))
 
         # Rating normalization
-        if "rating" in self.df.columns:
-            self.df["rating"] = pd.to_numeric(
-                self.df["rating"], errors="coerce"
+        if "rating" in df.columns:
+            df["rating"] = pd.to_numeric(
+                df["rating"], errors="coerce"
             ).fillna(1).clip(1, 5).astype(int)
 
         # Fill text columns
         for col in ["review_text", "reviewer", "product_name", "category"]:
-            if col in self.df.columns:
-                self.df[col] = self.df[col].fillna("Unknown")
+            if col in df.columns:
+                df[col] = df[col].fillna("Unknown")
 
         # Normalize "verified"
-        if "verified" in self.df.columns:
-            self.df["verified"] = (
-                self.df["verified"]
+        if "verified" in df.columns:
+            df["verified"] = (
+                df["verified"]
                 .astype(str)
                 .str.lower()
                 .apply(lambda x: "yes" if x in ["yes", "true", "verified", "1"] else "no")
             )
 
-        # Ensure date is in datetime format (and convert NaT to None for MongoDB)
-        if "date" in self.df.columns:
-            self.df["date"] = pd.to_datetime(self.df["date"], errors="coerce")
+        # Normalize "Oct, 2024" / "6 days ago" style dates to days (and convert NaT to None for MongoDB)
+        if "date" in df.columns:
+            df["date"] = normalize_review_dates(df["date"], df.get("scraped_date"))
             # Convert NaT (invalid dates) to None for MongoDB compatibility
-            self.df["date"] = self.df["date"].where(self.df["date"].notna(), None)
+            df["date"] = df["date"].where(df["date"].notna(), None)
 
         print("🧹 Data cleaning completed")
+        return df
 
     # -------------------------------------------------------------
     # MongoDB Operations
@@ -336,11 +752,16 @@ class DataLoader:
                     "sentiment_label": sentiment["sentiment"]
                 })
             
+            # Assign the next review_id so MongoDB and memory agree
+            if review_data.get("review_id") is None:
+                review_data["review_id"] = self._next_review_id()
+            
             # Insert into MongoDB
             result = self.collection.insert_one(review_data)
             
-            # Update local DataFrame
-            self._refresh_from_mongodb()
+            # Append to the in-memory store and patch indexes/aggregates
+            if self.loaded:
+                self._append_row(review_data)
             
             print(f"✅ Added review with ID: {result.inserted_id}")
             return True
@@ -349,6 +770,96 @@ class DataLoader:
             print(f"❌ Error adding review: {e}")
             return False
 
+    def _next_review_id(self) -> int:
+        return self.index.max_id + 1
+
+    def _normalize_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the _clean_data rules to a single document"""
+        row = {key: value for key, value in record.items() if key in MONGO_FIELDS}
+
+        rating = pd.to_numeric(row.get("rating"), errors="coerce")
+        row["rating"] = 1 if pd.isna(rating) else int(min(max(rating, 1), 5))
+
+        for col in ["review_text", "reviewer", "product_name", "category"]:
+            if row.get(col) is None:
+                row[col] = "Unknown"
+
+        verified = str(row.get("verified")).lower()
+        row["verified"] = "yes" if verified in ["yes", "true", "verified", "1"] else "no"
+
+        if "date" in row:
+            date = normalize_review_date(row["date"], row.get("scraped_date"))
+            row["date"] = pd.NaT if date is None else date
+
+        return row
+
+    def _append_row(self, record: Dict[str, Any]):
+        """Append one document without reloading: O(1) index, cache and stats patches"""
+        row = self._normalize_record(record)
+        row.update(normalized_values(row))
+        # Reviews added through the API usually carry no scraped_date
+        scraped = row.get("scraped_date")
+        timestamp = record.get("created_at") if scraped is None or pd.isna(scraped) else scraped
+
+        with self._append_lock:
+            state = self.state
+            previous_generation = state.generation
+            is_new_product = self._apply_append(state, row, timestamp)
+            self._patch_stats(previous_generation, state.generation, row, is_new_product)
+
+    def _apply_append(self, state: DatasetState, row: Dict[str, Any], timestamp: Any) -> bool:
+        """Patch every index of `state` for one appended row (caller holds the append lock)"""
+        position = state.base_rows + len(state.appended)
+        state.appended.append((row, timestamp))
+        state.store.append(row)
+
+        is_new_product = row["product_name"] not in state.index.postings.get("product", {})
+        state.index.add_row(position, row)
+        if state.row_cache is not None:
+            state.row_cache.append(row)
+        if state.search_index is not None:
+            state.search_index.add_row(position, row)
+        state.suggest_index.add_review(row["product_name"], row["category"])
+        state.cube.add(row)
+        state.recency.add(position, row, timestamp)
+        state.generation += 1
+        return is_new_product
+
+    def _patch_stats(self, previous_generation: int, generation: int, row: Dict[str, Any], is_new_product: bool):
+        """Carry cached stats forward to the new generation instead of recomputing"""
+        cached = self._stats_cache
+        if cached is None or cached[0] != previous_generation or cached[1].get("status") != "loaded":
+            return
+
+        stats = dict(cached[1])
+        stats["total_reviews"] += 1
+        stats["total_products"] += int(is_new_product)
+
+        # Re-ranked from the cube's first-appearance counts, so ties order as in a recompute
+        categories = {c: n for c, n in self.cube.category_reviews.items() if c is not None}
+        stats["categories"] = dict(ranked(categories))
+
+        ratings = dict(stats["ratings"])
+        ratings[str(row["rating"])] = ratings.get(str(row["rating"]), 0) + 1
+        stats["ratings"] = ratings
+        rating_sum = sum(int(value) * count for value, count in ratings.items())
+        stats["average_rating"] = round(rating_sum / stats["total_reviews"], 2)
+
+        stats["verified_reviews"] += int(row["verified"] == "yes")
+
+        if row.get("sentiment_label"):
+            # A frame without sentiment gains the column (and the stats key) with its first labelled row
+            sentiment = dict(stats.get("sentiment", {}))
+            sentiment[row["sentiment_label"]] = sentiment.get(row["sentiment_label"], 0) + 1
+            stats["sentiment"] = dict(ranked(sentiment))
+
+        self._stats_cache = (generation, stats)
+
+    def refresh(self):
+        """Explicit full reload of the in-memory dataset from MongoDB"""
+        self._refresh_from_mongodb()
+        self.load_phase = "ready"
+
     def _refresh_from_mongodb(self):
         """Refresh DataFrame from MongoDB"""
         if self.collection is not None:
@@ -396,34 +907,126 @@ class DataLoader:
         if not self.loaded:
             self.load_data()
 
-        df = self.df.copy()
+        state = self.state
+        # Intersect the posting lists of all active filters and apply the
+        # resulting row positions once, so only matching rows are materialized
+        positions = state.index.select(filters)
+        store = state.store
 
-        if df.empty:
+        if not len(store):
             return []
 
-        if filters.get("category"):
-            df = df[df["category"].str.contains(filters["category"], case=False)]
+        if positions is None:
+            positions = np.arange(len(store))
+
+        if limit:
+            positions = positions[:limit]
+
+        result = store.take(positions)
 
-        if filters.get("product"):
-            df = df[df["product_name"].str.contains(filters["product"], case=False)]
+        print(f"🔍 Returning {len(result)} reviews")
+        return result.to_dict("records")
 
-        if filters.get("min_rating"):
-            df = df[df["rating"] >= filters["min_rating"]]
+    def _resolve_cursor(self, state: DatasetState, rows: int, cursor: str) -> int:
+        """Frame position the cursor points at (re-resolved by id if the frame changed)"""
+        review_id, position = _decode_cursor(cursor)
 
-        if filters.get("max_rating"):
-            df = df[df["rating"] <= filters["max_rating"]]
+        if 0 <= position < rows and int(state.store.value(position, "review_id")) == review_id:
+            return position
 
-        if "verified" in filters:
-            if filters["verified"]:
-                df = df[df["verified"] == "yes"]
+        position = state.index.position_of(review_id)
+        if position is None:
+            raise ValueError("Cursor refers to an unknown review")
+        return position
+
+    def _page_window(
+        self,
+        state: DatasetState,
+        rows: int,
+        limit: int,
+        offset: int,
+        cursor: Optional[str],
+        filters: Dict[str, Any]
+    ) -> Tuple[np.ndarray, Optional[str], int]:
+        """Row positions of one page, the cursor for the next page, and the match count"""
+        positions = state.index.select(filters)
+        if positions is not None and len(positions) and positions[-1] >= rows:
+            # Rows appended after the row count was read
+            positions = positions[:np.searchsorted(positions, rows)]
+        total = rows if positions is None else len(positions)
+
+        if cursor:
+            last_position = self._resolve_cursor(state, rows, cursor)
+            if positions is None:
+                start = last_position + 1
             else:
-                df = df[df["verified"] == "no"]
+                start = int(np.searchsorted(positions, last_position, side="right"))
+        else:
+            start = offset
 
-        if limit:
-            df = df.head(limit)
+        end = min(start + limit, total)
+        if start >= end:
+            return np.empty(0, dtype=np.int64), None, total
+
+        window = np.arange(start, end) if positions is None else positions[start:end]
 
-        print(f"🔍 Returning {len(df)} reviews")
-        return df.to_dict("records")
+        next_cursor = None
+        if end < total:
+            last_position = int(window[-1])
+            next_cursor = _encode_cursor(state.store.value(last_position, "review_id"), last_position)
+
+        return window, next_cursor, total
+
+    def get_reviews_page(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        **filters
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Return one page of filtered reviews plus the cursor for the next page.
+
+        Only the requested window is materialized. With a cursor the start of
+        the page is found by binary search on the matching positions, so deep
+        pages cost the same as the first one.
+        """
+        if not self.loaded:
+            self.load_data()
+
+        state = self.state
+        rows = len(state.store)
+        if not rows:
+            return [], None
+
+        window, next_cursor, total = self._page_window(state, rows, limit, offset, cursor, filters)
+        records = state.store.take(window).to_dict("records")
+
+        print(f"🔍 Returning {len(records)} of {total} reviews")
+        return records, next_cursor
+
+    def get_reviews_page_json(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        **filters
+    ) -> Tuple[bytes, Optional[str]]:
+        """Same page as get_reviews_page, assembled from the pre-serialized row cache"""
+        if not self.loaded:
+            self.load_data()
+
+        state = self.state
+        rows = len(state.store)
+        if not rows:
+            return b"[]", None
+
+        window, next_cursor, _ = self._page_window(state, rows, limit, offset, cursor, filters)
+        if state.row_cache is None:
+            # Row cache still building: encode just this page
+            page = RowJsonCache()
+            page.build(state.store.take(window))
+            return page.review_array(range(len(page))), next_cursor
+        return state.row_cache.review_array(window), next_cursor
 
     # -------------------------------------------------------------
     # Stats (with MongoDB data)
@@ -432,7 +1035,21 @@ class DataLoader:
         if not self.loaded:
             self.load_data()
 
-        if self.df.empty:
+        # Reuse the stats computed for the current dataset generation
+        state = self.state
+        generation = state.generation
+        cached = self._stats_cache
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        stats = self._compute_stats(state)
+        self._stats_cache = (generation, stats)
+        return stats
+
+    def _compute_stats(self, state: Optional[DatasetState] = None) -> Dict[str, Any]:
+        state = state or self.state
+        df = state.store.frame()
+        if df is None or df.empty:
             return {
                 "total_reviews": 0,
                 "total_products": 0,
@@ -443,15 +1060,18 @@ class DataLoader:
                 "mongo_connected": self.collection is not None
             }
 
-        df = self.df
+        cube = state.cube
+        totals = cube.totals()
+        rating_counts = cube.rating_counts()
+        category_counts = {c: n for c, n in cube.category_reviews.items() if c is not None}
 
         stats = {
-            "total_reviews": int(len(df)),
-            "total_products": int(df["product_name"].nunique()),
-            "categories": df["category"].value_counts().to_dict(),
-            "ratings": {str(i): int((df["rating"] == i).sum()) for i in range(1, 5 + 1)},
-            "verified_reviews": int((df["verified"] == "yes").sum()),
-            "average_rating": round(float(df["rating"].mean()), 2),
+            "total_reviews": totals.reviews,
+            "total_products": cube.product_count(),
+            "categories": dict(ranked(category_counts)),
+            "ratings": {str(i): rating_counts.get(i, 0) for i in range(1, 5 + 1)},
+            "verified_reviews": totals.verified,
+            "average_rating": round(float(totals.avg_rating), 2),
             "status": "loaded",
             "dataset_path": str(self.csv_path),
             "mongo_connected": self.collection is not None,
@@ -467,28 +1087,154 @@ class DataLoader:
     # -------------------------------------------------------------
     # Search reviews
     # -------------------------------------------------------------
-    def search_reviews(self, query: str, limit: int = 20) -> List[Dict]:
+    def pending_index(self, query: str, rank: Optional[str] = None) -> Optional[Future]:
+        """The background index build a query has to wait for, or None if it can run now"""
+        state = self.state
+        if state.search_backend == "memory" and state.search_index is None and (is_structured(query) or rank):
+            return state.indexed
+        return None
+
+    def _search_positions(
+        self, state: DatasetState, query: str, limit: int, rank: Optional[str] = None
+    ) -> Tuple[DatasetState, np.ndarray]:
+        """Hit positions for a query, plus the state they refer to"""
+        if state.search_backend == "memory" and state.search_index is None and (is_structured(query) or rank):
+            # Only the search index can evaluate these: wait for the background build
+            # (the API awaits pending_index() first, so this never blocks its event loop)
+            state.indexed.result()
+            state = self.state
+
+        if state.search_backend == "memory" and state.search_index is None:
+            # Search index still building: scan with the index's plain-query rule
+            # (substring of a normalized field), and keep the result out of the cache
+            positions = self._scan_positions(state, query, limit)
+            print(f"🔍 Search '{query}' found {len(positions)} results (scan, index building)")
+            return state, positions
+
+        # Matching is on normalized text, so queries differing only in case or spacing
+        # share an entry; structured queries keep their case (AND/OR/NOT are upper-case only)
+        normalized = query if is_structured(query) else normalize_text(query)
+        cache_key = (state.generation, normalized, limit, rank)
+        positions = self.search_cache.get(cache_key)
+        if positions is not None:
+            print(f"🔍 Search '{query}' found {len(positions)} results (cached)")
+            return state, positions
+
+        positions = self._run_search(state, query, limit, rank)
+        self.search_cache.put(cache_key, positions)
+        return state, positions
+
+    def _run_search(self, state: DatasetState, query: str, limit: int, rank: Optional[str] = None) -> np.ndarray:
+        if state.search_backend == "mongo":
+            positions = self._mongo_search_positions(state, query, limit, rank)
+        else:
+            # Resolve through the inverted index; cost follows the matches, not the text size
+            positions = state.search_index.search(query, limit, rank=rank)
+        if positions is not None:
+            print(f"🔍 Search '{query}' found {len(positions)} results")
+            return positions
+
+        # No word characters to look up (e.g. "++"): fall back to a scan
+        positions = self._scan_positions(state, query, limit)
+
+        print(f"🔍 Search '{query}' found {len(positions)} results")
+        return positions
+
+    def _scan_positions(self, state: DatasetState, query: str, limit: int) -> np.ndarray:
+        """First `limit` rows where a searchable column contains the normalized query"""
+        needle = normalize_text(query)
+        df = state.store.frame()
+
+        mask = (
+            df["review_text_norm"].str.contains(needle, regex=False) |
+            df["product_name_norm"].str.contains(needle, regex=False) |
+            df["category_norm"].str.contains(needle, regex=False) |
+            df["reviewer_norm"].str.contains(needle, regex=False)
+        )
+
+        return np.flatnonzero(mask.to_numpy())[:limit]
+
+    def _mongo_search_positions(
+        self, state: DatasetState, query: str, limit: int, rank: Optional[str] = None
+    ) -> Optional[np.ndarray]:
+        """Run the query on the collection's text index and map the hits to row positions"""
+        try:
+            review_ids = self.mongo_search.search_ids(query, limit, rank)
+        except Exception as e:
+            print(f"⚠️ MongoDB text search failed, scanning in memory: {e}")
+            return None
+        if review_ids is None:
+            return None
+        return np.asarray(state.index.positions_of(review_ids), dtype=np.int64)
+
+    def search_reviews(self, query: str, limit: int = 20, rank: Optional[str] = None) -> List[Dict]:
         if not self.loaded:
             self.load_data()
 
         if not query or len(query) < 2:
             return []
 
-        query = query.lower()
-        df = self.df
+        state, positions = self._search_positions(self.state, query, limit, rank)
+        return state.store.take(positions).to_dict("records")
 
-        mask = (
-            df["review_text"].str.lower().str.contains(query) |
-            df["product_name"].str.lower().str.contains(query) |
-            df["category"].str.lower().str.contains(query) |
-            df["reviewer"].str.lower().str.contains(query)
-        )
+    def search_reviews_json(self, query: str, limit: int = 20, rank: Optional[str] = None) -> List[bytes]:
+        """Pre-serialized search hits (search projection) from the row cache"""
+        if not self.loaded:
+            self.load_data()
+
+        if not query or len(query) < 2:
+            return []
+
+        state, positions = self._search_positions(self.state, query, limit, rank)
+        if state.row_cache is None:
+            # Row cache still building: encode just these hits
+            hits = RowJsonCache()
+            hits.build(state.store.take(positions))
+            return hits.search_array(range(len(hits)))
+        return state.row_cache.search_array(positions)
 
-        results = df[mask].head(limit)
+    def search_snippets(
+        self, query: str, limit: int = 20, rank: Optional[str] = None, length: int = 160
+    ) -> List[Dict]:
+        """Search hits with a highlighted review_text window instead of the full text"""
+        if not self.loaded:
+            self.load_data()
 
-        print(f"🔍 Search '{query}' found {len(results)} results")
+        if not query or len(query) < 2:
+            return []
 
-        return results.to_dict("records")
+        state, positions = self._search_positions(self.state, query, limit, rank)
+        search_index = state.search_index if state.search_backend == "memory" else None
+        if search_index is not None:
+            terms = search_index.highlight_terms(query)
+        elif is_structured(query):
+            terms = set(positive_terms(parse_query(query, tokenize)))
+        else:
+            terms = set(tokenize(query))
+
+        results = []
+        for position, item in zip(positions, state.store.take(positions).to_dict("records")):
+            review = canonical_review(item)
+            if search_index is not None:
+                starts = search_index.term_offsets(int(position), terms, "review_text")
+            else:
+                # No positional index (pushdown mode, or still building): tokenize just this hit
+                starts = [start for token, start in token_spans(review["review_text"]) if token in terms]
+            results.append({
+                "review_id": review["review_id"],
+                "category": review["category"],
+                "product_name": review["product_name"],
+                "rating": review["rating"],
+                "reviewer": review["reviewer"],
+                "snippet": make_snippet(review["review_text"], starts, length)
+            })
+        return results
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[Dict]:
+        """Autocomplete suggestions (products, categories, keywords) by review count"""
+        if not self.loaded:
+            self.load_data()
+        return self.suggest_index.suggest(prefix, limit)
 
     # -------------------------------------------------------------
     # Metadata helpers
@@ -496,21 +1242,55 @@ class DataLoader:
     def get_categories(self) -> List[str]:
         if not self.loaded:
             self.load_data()
-        return sorted(self.df["category"].dropna().unique().tolist())
+        return sorted(category for category in self.cube.by_category() if category is not None)
 
     def get_products(self) -> List[str]:
         if not self.loaded:
             self.load_data()
-        return sorted(self.df["product_name"].dropna().unique().tolist())
+        return sorted(product for product in self.cube.product_category if product is not None)
 
     def get_review_by_id(self, review_id: int) -> Optional[Dict]:
         if not self.loaded:
             self.load_data()
 
-        row = self.df[self.df["review_id"] == review_id]
-        if row.empty:
+        state = self.state
+        position = state.index.position_of(review_id)
+        if position is None:
             return None
-        return row.iloc[0].to_dict()
+        return state.store.take([position]).iloc[0].to_dict()
+
+    def get_reviews_by_ids(self, review_ids: List[int]) -> List[Dict]:
+        """Fetch several reviews by id in one positional take (unknown ids are skipped)"""
+        if not self.loaded:
+            self.load_data()
+
+        state = self.state
+        positions = state.index.positions_of(review_ids)
+        if not positions:
+            return []
+        return state.store.take(positions).to_dict("records")
+
+    def get_recent_reviews(
+        self,
+        limit: int = 10,
+        product: Optional[str] = None,
+        category: Optional[str] = None
+    ) -> List[Dict]:
+        """Most recently scraped (or added) reviews, overall or for one exact product / category"""
+        if not self.loaded:
+            self.load_data()
+
+        state = self.state
+        if product is not None:
+            positions = state.recency.recent(limit, "product_name", product)
+        elif category is not None:
+            positions = state.recency.recent(limit, "category", category)
+        else:
+            positions = state.recency.recent(limit)
+
+        if not positions:
+            return []
+        return state.store.take(positions).to_dict("records")
 
 
 # -------------------------------------------------------------
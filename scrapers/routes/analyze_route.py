@@ -5,18 +5,14 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
+from services.aggregate_cube import (
+    dataset_cube, histogram_median, histogram_mode, histogram_std, rated_counts, ranked
+)
+from services.dataset_provider import load_dataset
+from services.rating_trends import dataset_rollups
 
 router = APIRouter(prefix="/api/analyze", tags=["Analysis"])
 
-# Load dataset
-def load_dataset():
-    try:
-        df = pd.read_csv("data/flipkart_MASTER_DATASET_20251205_161226.csv", encoding='utf-8-sig')
-        return df
-    except Exception as e:
-        print(f"Error loading dataset: {e}")
-        return pd.DataFrame()
-
 @router.get("/stats")
 async def get_detailed_stats():
     """Get comprehensive dataset statistics"""
@@ -24,26 +20,29 @@ async def get_detailed_stats():
     if df.empty:
         raise HTTPException(status_code=404, detail="Dataset not loaded")
     
-    total_reviews = len(df)
-    total_products = df['product_name'].nunique()
+    cube = dataset_cube()
+    totals = cube.totals()
+    total_reviews = totals.reviews
+    total_products = cube.product_count()
     
     # Category statistics
     category_stats = {}
     if 'category' in df.columns:
-        for category in df['category'].unique():
-            category_df = df[df['category'] == category]
+        products_by_category = cube.products_by_category()
+        for category, stats in cube.by_category().items():
             category_stats[str(category)] = {
-                "review_count": len(category_df),
-                "product_count": category_df['product_name'].nunique(),
-                "avg_rating": float(category_df['rating'].mean()) if not pd.isna(category_df['rating'].mean()) else 0,
-                "verified_reviews": int((category_df['verified'].str.lower() == 'yes').sum())
+                "review_count": stats.reviews,
+                "product_count": len(products_by_category.get(category, {})),
+                "avg_rating": float(stats.avg_rating) if not pd.isna(stats.avg_rating) else 0,
+                "verified_reviews": stats.verified
             }
     
     # Rating statistics
     rating_stats = {}
     if 'rating' in df.columns:
+        rating_counts = cube.rating_counts()
         for rating in range(1, 6):
-            count = (df['rating'] == rating).sum()
+            count = rating_counts.get(rating, 0)
             percentage = (count / total_reviews) * 100
             rating_stats[str(rating)] = {
                 "count": int(count),
@@ -51,33 +50,32 @@ async def get_detailed_stats():
             }
     
     # Verified reviews
-    verified_count = 0
-    if 'verified' in df.columns:
-        verified_count = int((df['verified'].str.lower() == 'yes').sum())
+    verified_count = totals.verified if 'verified' in df.columns else 0
     
     # Text analysis
     text_stats = {}
     if 'review_text' in df.columns:
-        df['review_length'] = df['review_text'].astype(str).str.len()
+        text = cube.text_totals()
         text_stats = {
-            "avg_length": float(df['review_length'].mean()),
-            "min_length": int(df['review_length'].min()),
-            "max_length": int(df['review_length'].max()),
-            "total_words": int(df['review_text'].astype(str).str.split().str.len().sum())
+            "avg_length": float(text.length_sum / text.reviews),
+            "min_length": int(text.min_length),
+            "max_length": int(text.max_length),
+            "total_words": int(text.words)
         }
     
     # Top products by review count
     top_products = []
     if 'product_name' in df.columns:
-        product_counts = df['product_name'].value_counts().head(10)
-        for product, count in product_counts.items():
-            product_df = df[df['product_name'] == product]
-            avg_rating = product_df['rating'].mean()
+        by_product = cube.by_product()
+        product_counts = ranked({product: stats.reviews for product, stats in by_product.items()}, 10)
+        for product, count in product_counts:
+            avg_rating = by_product[product].avg_rating
+            category = cube.product_category.get(product) if 'category' in df.columns else 'Unknown'
             top_products.append({
                 "product_name": str(product),
                 "review_count": int(count),
                 "avg_rating": float(avg_rating) if not pd.isna(avg_rating) else 0,
-                "category": str(product_df.iloc[0].get('category', 'Unknown'))
+                "category": str(category) if category is not None else 'Unknown'
             })
     
     return {
@@ -86,7 +84,7 @@ async def get_detailed_stats():
             "total_products": total_products,
             "verified_reviews": verified_count,
             "verified_percentage": float((verified_count / total_reviews) * 100) if total_reviews > 0 else 0,
-            "overall_avg_rating": float(df['rating'].mean()) if 'rating' in df.columns else 0,
+            "overall_avg_rating": float(totals.avg_rating) if 'rating' in df.columns else 0,
             "categories_count": len(category_stats)
         },
         "categories": category_stats,
@@ -96,7 +94,7 @@ async def get_detailed_stats():
         "dataset_info": {
             "last_updated": datetime.now().isoformat(),
             "file_size_mb": 0.1,  # Approximate
-            "scrape_phases": list(df['scrape_phase'].unique()) if 'scrape_phase' in df.columns else ["Unknown"]
+            "scrape_phases": list(cube.scrape_phases) if 'scrape_phase' in df.columns else ["Unknown"]
         }
     }
 
@@ -110,21 +108,25 @@ async def get_category_insights(category_name: str):
     if 'category' not in df.columns:
         raise HTTPException(status_code=400, detail="Category data not available")
     
-    # Get category data
-    category_df = df[df['category'].str.contains(category_name, case=False, na=False)]
+    # Get category data (the pattern is matched against distinct category names)
+    cube = dataset_cube()
+    categories = cube.categories_matching(category_name)
+    totals = cube.totals(categories)
     
-    if category_df.empty:
+    if totals.reviews == 0:
         raise HTTPException(status_code=404, detail="Category not found")
     
     # Basic stats
-    total_reviews = len(category_df)
-    total_products = category_df['product_name'].nunique()
-    avg_rating = category_df['rating'].mean()
+    total_reviews = totals.reviews
+    by_product = cube.by_product(categories)
+    total_products = len(by_product)
+    avg_rating = totals.avg_rating
     
     # Rating distribution
+    rating_counts = cube.rating_counts(categories)
     rating_dist = {}
     for rating in range(1, 6):
-        count = (category_df['rating'] == rating).sum()
+        count = rating_counts.get(rating, 0)
         percentage = (count / total_reviews) * 100
         rating_dist[str(rating)] = {
             "count": int(count),
@@ -133,42 +135,46 @@ async def get_category_insights(category_name: str):
     
     # Top products in this category
     top_products = []
-    product_counts = category_df['product_name'].value_counts().head(5)
-    for product, count in product_counts.items():
-        product_df = category_df[category_df['product_name'] == product]
+    product_counts = ranked({product: stats.reviews for product, stats in by_product.items()}, 5)
+    for product, count in product_counts:
         top_products.append({
             "product_name": str(product),
             "review_count": int(count),
-            "avg_rating": float(product_df['rating'].mean()),
-            "verified_count": int((product_df['verified'].str.lower() == 'yes').sum())
+            "avg_rating": float(by_product[product].avg_rating),
+            "verified_count": by_product[product].verified
         })
     
     # Sentiment-like analysis (based on rating)
     sentiment = {
-        "positive": int((category_df['rating'] >= 4).sum()),
-        "neutral": int((category_df['rating'] == 3).sum()),
-        "negative": int((category_df['rating'] <= 2).sum())
+        "positive": sum(count for rating, count in rating_counts.items() if rating is not None and rating >= 4),
+        "neutral": sum(count for rating, count in rating_counts.items() if rating == 3),
+        "negative": sum(count for rating, count in rating_counts.items() if rating is not None and rating <= 2)
     }
     
+    text = cube.text_totals(categories)
     return {
         "category": category_name,
         "overview": {
             "total_reviews": total_reviews,
             "total_products": total_products,
             "average_rating": float(avg_rating) if not pd.isna(avg_rating) else 0,
-            "verified_reviews": int((category_df['verified'].str.lower() == 'yes').sum())
+            "verified_reviews": totals.verified
         },
         "rating_distribution": rating_dist,
         "sentiment_analysis": sentiment,
         "top_products": top_products,
         "review_trends": {
             "most_common_words": ["good", "product", "quality", "value", "price"],  # Placeholder
-            "avg_review_length": float(category_df['review_text'].astype(str).str.len().mean()) if 'review_text' in category_df.columns else 0
+            "avg_review_length": float(text.length_sum / text.reviews) if 'review_text' in df.columns else 0
         }
     }
 
 @router.get("/rating-analysis")
-async def rating_analysis():
+async def rating_analysis(
+    granularity: str = Query("month", pattern="^(week|month|quarter)$", description="Trend bucket size"),
+    trend_category: Optional[str] = Query(None, alias="category", description="Restrict the trend to one category"),
+    trend_product: Optional[str] = Query(None, alias="product", description="Restrict the trend to one product")
+):
     """Analyze rating patterns"""
     df = load_dataset()
     if df.empty:
@@ -177,63 +183,54 @@ async def rating_analysis():
     if 'rating' not in df.columns:
         raise HTTPException(status_code=400, detail="Rating data not available")
     
+    cube = dataset_cube()
+
     # Rating by category
     rating_by_category = {}
     if 'category' in df.columns:
-        for category in df['category'].unique():
-            category_df = df[df['category'] == category]
+        category_totals = cube.by_category()
+        for category, counts in cube.rating_counts_by_category().items():
             rating_by_category[str(category)] = {
-                "avg_rating": float(category_df['rating'].mean()),
-                "median_rating": float(category_df['rating'].median()),
-                "rating_distribution": category_df['rating'].value_counts().sort_index().to_dict()
+                "avg_rating": float(category_totals[category].avg_rating),
+                "median_rating": histogram_median(counts),
+                "rating_distribution": dict(rated_counts(counts))
             }
     
-    # Rating trends (if date available)
+    # Rating trends, merged from per-day rollups (dates are normalized once per file version)
     rating_trends = {}
     if 'date' in df.columns:
-        try:
-            df['date_parsed'] = pd.to_datetime(df['date'], errors='coerce')
-            monthly_ratings = df.groupby(df['date_parsed'].dt.to_period('M'))['rating'].mean()
-            rating_trends = {
-                "monthly_avg": monthly_ratings.dropna().to_dict(),
-                "overall_trend": "stable"  # Placeholder
-            }
-        except:
-            rating_trends = {"error": "Date parsing failed"}
+        rating_trends = dataset_rollups().trend(granularity, category=trend_category, product=trend_product)
     
     # Verified vs Non-verified ratings
     verified_analysis = {}
     if 'verified' in df.columns:
-        verified_df = df[df['verified'].str.lower() == 'yes']
-        non_verified_df = df[df['verified'].str.lower() == 'no']
-        
-        verified_analysis = {
-            "verified": {
-                "count": len(verified_df),
-                "avg_rating": float(verified_df['rating'].mean()) if len(verified_df) > 0 else 0,
-                "rating_dist": verified_df['rating'].value_counts().sort_index().to_dict()
-            },
-            "non_verified": {
-                "count": len(non_verified_df),
-                "avg_rating": float(non_verified_df['rating'].mean()) if len(non_verified_df) > 0 else 0,
-                "rating_dist": non_verified_df['rating'].value_counts().sort_index().to_dict()
+        verified_totals = cube.by_verified()
+        verified_ratings = cube.rating_counts_by_verified()
+        for key, value in (("verified", "yes"), ("non_verified", "no")):
+            stats = verified_totals.get(value)
+            verified_analysis[key] = {
+                "count": stats.reviews if stats else 0,
+                "avg_rating": float(stats.avg_rating) if stats else 0,
+                "rating_dist": dict(rated_counts(verified_ratings.get(value, {})))
             }
-        }
     
+    totals = cube.totals()
+    rating_counts = cube.rating_counts()
+    mode = histogram_mode(rating_counts)
     return {
         "overall_stats": {
-            "average_rating": float(df['rating'].mean()),
-            "median_rating": float(df['rating'].median()),
-            "mode_rating": int(df['rating'].mode()[0]) if len(df['rating'].mode()) > 0 else 0,
-            "rating_std": float(df['rating'].std())
+            "average_rating": float(totals.avg_rating),
+            "median_rating": histogram_median(rating_counts),
+            "mode_rating": int(mode) if mode is not None else 0,
+            "rating_std": histogram_std(rating_counts)
         },
         "rating_by_category": rating_by_category,
         "verified_analysis": verified_analysis,
         "rating_trends": rating_trends,
         "rating_insights": {
-            "most_common_rating": int(df['rating'].mode()[0]) if len(df['rating'].mode()) > 0 else 0,
-            "percentage_5_star": float((df['rating'] == 5).sum() / len(df) * 100),
-            "percentage_1_star": float((df['rating'] == 1).sum() / len(df) * 100)
+            "most_common_rating": int(mode) if mode is not None else 0,
+            "percentage_5_star": float(rating_counts.get(5, 0) / totals.reviews * 100),
+            "percentage_1_star": float(rating_counts.get(1, 0) / totals.reviews * 100)
         }
     }
 
@@ -247,32 +244,40 @@ async def compare_categories(
     if df.empty:
         raise HTTPException(status_code=404, detail="Dataset not loaded")
     
-    # Get data for both categories
-    cat1_df = df[df['category'].str.contains(category1, case=False, na=False)]
-    cat2_df = df[df['category'].str.contains(category2, case=False, na=False)]
+    # Totals for both categories, from the aggregate cube
+    cube = dataset_cube()
+    cat1 = cube.categories_matching(category1)
+    cat2 = cube.categories_matching(category2)
+    cat1_totals, cat2_totals = cube.totals(cat1), cube.totals(cat2)
     
-    if cat1_df.empty or cat2_df.empty:
+    if cat1_totals.reviews == 0 or cat2_totals.reviews == 0:
         raise HTTPException(status_code=404, detail="One or both categories not found")
     
+    cat1_products, cat2_products = cube.by_product(cat1), cube.by_product(cat2)
+    
+    def top_product(products):
+        top = ranked({product: stats.reviews for product, stats in products.items()}, 1)
+        return top[0][0] if top else "N/A"
+    
     comparison = {
         category1: {
-            "total_reviews": len(cat1_df),
-            "total_products": cat1_df['product_name'].nunique(),
-            "avg_rating": float(cat1_df['rating'].mean()),
-            "verified_percentage": float((cat1_df['verified'].str.lower() == 'yes').sum() / len(cat1_df) * 100),
-            "top_product": cat1_df['product_name'].value_counts().index[0] if len(cat1_df) > 0 else "N/A"
+            "total_reviews": cat1_totals.reviews,
+            "total_products": len(cat1_products),
+            "avg_rating": float(cat1_totals.avg_rating),
+            "verified_percentage": float(cat1_totals.verified / cat1_totals.reviews * 100),
+            "top_product": top_product(cat1_products)
         },
         category2: {
-            "total_reviews": len(cat2_df),
-            "total_products": cat2_df['product_name'].nunique(),
-            "avg_rating": float(cat2_df['rating'].mean()),
-            "verified_percentage": float((cat2_df['verified'].str.lower() == 'yes').sum() / len(cat2_df) * 100),
-            "top_product": cat2_df['product_name'].value_counts().index[0] if len(cat2_df) > 0 else "N/A"
+            "total_reviews": cat2_totals.reviews,
+            "total_products": len(cat2_products),
+            "avg_rating": float(cat2_totals.avg_rating),
+            "verified_percentage": float(cat2_totals.verified / cat2_totals.reviews * 100),
+            "top_product": top_product(cat2_products)
         },
         "differences": {
-            "review_count_diff": len(cat1_df) - len(cat2_df),
-            "rating_diff": float(cat1_df['rating'].mean() - cat2_df['rating'].mean()),
-            "product_count_diff": cat1_df['product_name'].nunique() - cat2_df['product_name'].nunique()
+            "review_count_diff": cat1_totals.reviews - cat2_totals.reviews,
+            "rating_diff": float(cat1_totals.avg_rating - cat2_totals.avg_rating),
+            "product_count_diff": len(cat1_products) - len(cat2_products)
         }
     }
     
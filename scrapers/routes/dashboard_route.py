@@ -1,19 +1,30 @@
 # backend/routes/dashboard_route.py
-from fastapi import APIRouter, HTTPException
-from typing import Dict, List
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, List, Optional
 import pandas as pd
 import json
 from datetime import datetime
+from services.aggregate_cube import dataset_cube
+from services.dataset_provider import load_dataset
+from services.recency_index import dataset_recency
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
-def load_dataset():
-    try:
-        df = pd.read_csv("data/flipkart_MASTER_DATASET_20251205_161226.csv", encoding='utf-8-sig')
-        return df
-    except Exception as e:
-        print(f"Error loading dataset: {e}")
-        return pd.DataFrame()
+def recent_review_cards(df: pd.DataFrame, positions: List[int]) -> List[Dict]:
+    """Dashboard cards for the given row positions"""
+    cards = []
+    for row in df.iloc[positions].to_dict('records'):
+        review = str(row.get('review_text', ''))
+        rating = row.get('rating', 0)
+        cards.append({
+            "product": str(row.get('product_name', '')),
+            "category": str(row.get('category', '')),
+            "rating": int(rating) if not pd.isna(rating) else 0,
+            "review": review[:100] + "..." if len(review) > 100 else review,
+            "reviewer": str(row.get('reviewer', '')),
+            "date": str(row.get('scraped_date', ''))
+        })
+    return cards
 
 @router.get("/overview")
 async def get_dashboard_overview():
@@ -22,45 +33,36 @@ async def get_dashboard_overview():
     if df.empty:
         raise HTTPException(status_code=404, detail="Dataset not loaded")
     
-    total_reviews = len(df)
-    total_products = df['product_name'].nunique()
+    cube = dataset_cube()
+    totals = cube.totals()
+    total_reviews = totals.reviews
+    total_products = cube.product_count()
     
     # Category stats
     category_stats = []
     if 'category' in df.columns:
-        for category in df['category'].unique():
-            category_df = df[df['category'] == category]
+        products_by_category = cube.products_by_category()
+        for category, stats in cube.by_category().items():
             category_stats.append({
                 "name": str(category),
-                "reviews": len(category_df),
-                "products": category_df['product_name'].nunique(),
-                "avg_rating": float(category_df['rating'].mean()),
-                "verified_reviews": int((category_df['verified'].str.lower() == 'yes').sum())
+                "reviews": stats.reviews,
+                "products": len(products_by_category.get(category, {})),
+                "avg_rating": float(stats.avg_rating),
+                "verified_reviews": stats.verified
             })
     
-    # Recent reviews
+    # Recent reviews (maintained scraped_date ordering: only the top rows are touched)
     recent_reviews = []
     if 'scraped_date' in df.columns:
-        try:
-            df['scraped_date_parsed'] = pd.to_datetime(df['scraped_date'], errors='coerce')
-            recent_df = df.sort_values('scraped_date_parsed', ascending=False).head(10)
-            
-            for _, row in recent_df.iterrows():
-                recent_reviews.append({
-                    "product": str(row.get('product_name', '')),
-                    "category": str(row.get('category', '')),
-                    "rating": int(row.get('rating', 0)),
-                    "review": str(row.get('review_text', ''))[:100] + "..." if len(str(row.get('review_text', ''))) > 100 else str(row.get('review_text', '')),
-                    "reviewer": str(row.get('reviewer', '')),
-                    "date": str(row.get('scraped_date', ''))
-                })
-        except:
-            recent_reviews = []
+        recent_reviews = recent_review_cards(df, dataset_recency().recent(10))
     
     # Top rated products
     top_rated = []
     if 'product_name' in df.columns and 'rating' in df.columns:
-        product_ratings = df.groupby('product_name')['rating'].agg(['mean', 'count']).reset_index()
+        product_ratings = pd.DataFrame(
+            [(product, stats.avg_rating, stats.rated) for product, stats in cube.by_product().items()],
+            columns=['product_name', 'mean', 'count']
+        ).sort_values('product_name', ignore_index=True)
         top_rated_df = product_ratings[product_ratings['count'] >= 3].sort_values('mean', ascending=False).head(10)
         
         for _, row in top_rated_df.iterrows():
@@ -75,11 +77,37 @@ async def get_dashboard_overview():
             "total_reviews": total_reviews,
             "total_products": total_products,
             "categories": len(category_stats),
-            "overall_rating": float(df['rating'].mean()),
-            "verified_percentage": float((df['verified'].str.lower() == 'yes').sum() / total_reviews * 100)
+            "overall_rating": float(totals.avg_rating),
+            "verified_percentage": float(totals.verified / total_reviews * 100)
         },
         "category_stats": category_stats,
         "recent_reviews": recent_reviews,
         "top_rated": top_rated,
         "updated_at": datetime.now().isoformat()
+    }
+
+@router.get("/recent")
+async def get_recent_reviews(
+    limit: int = Query(10, ge=1, le=100),
+    product: Optional[str] = Query(None, description="Exact product name (case-insensitive)"),
+    category: Optional[str] = Query(None, description="Exact category name (case-insensitive)")
+):
+    """Most recently scraped reviews, overall or for one product / category"""
+    df = load_dataset()
+    if df.empty:
+        raise HTTPException(status_code=404, detail="Dataset not loaded")
+    
+    recency = dataset_recency()
+    if product is not None:
+        positions = recency.recent(limit, 'product_name', product)
+    elif category is not None:
+        positions = recency.recent(limit, 'category', category)
+    else:
+        positions = recency.recent(limit)
+    
+    return {
+        "product": product,
+        "category": category,
+        "reviews": recent_review_cards(df, positions),
+        "count": len(positions)
     }
\ No newline at end of file
@@ -4,17 +4,21 @@ from typing import List, Optional
 import pandas as pd
 import json
 from datetime import datetime
+from services.aggregate_cube import dataset_cube, ranked
+from services.product_search import ProductTrigramIndex
+from services.dataset_provider import get_provider, load_dataset
+from services.text_normalize import normalize_text
 
 router = APIRouter(prefix="/api/products", tags=["Products"])
 
-# Load dataset
-def load_dataset():
-    try:
-        df = pd.read_csv("data/flipkart_MASTER_DATASET_20251205_161226.csv", encoding='utf-8-sig')
-        return df
-    except Exception as e:
-        print(f"Error loading dataset: {e}")
-        return pd.DataFrame()
+def get_product_index() -> ProductTrigramIndex:
+    """Trigram index for the current dataset (built once per file version)"""
+    def build(df: pd.DataFrame) -> ProductTrigramIndex:
+        index = ProductTrigramIndex()
+        index.build(df)
+        return index
+    
+    return get_provider().derived("product_trigram_index", build)
 
 @router.get("/")
 async def get_all_products():
@@ -39,15 +43,18 @@ async def get_categories():
     if 'category' not in df.columns:
         return {"categories": [], "count": 0}
     
-    category_counts = df['category'].value_counts().to_dict()
+    cube = dataset_cube()
+    by_category = cube.by_category()
+    products_by_category = cube.products_by_category()
+    category_counts = ranked({c: stats.reviews for c, stats in by_category.items() if c is not None})
     
     categories = []
-    for category, count in category_counts.items():
-        # Get unique products in this category
-        category_products = df[df['category'] == category]['product_name'].unique().tolist()
+    for category, count in category_counts:
+        # Unique products in this category
+        category_products = list(products_by_category.get(category, {}))
         
-        # Get average rating for category
-        avg_rating = df[df['category'] == category]['rating'].mean()
+        # Average rating for category
+        avg_rating = by_category[category].avg_rating
         
         categories.append({
             "name": str(category),
@@ -60,7 +67,7 @@ async def get_categories():
     return {
         "categories": categories,
         "total_categories": len(categories),
-        "total_products": df['product_name'].nunique()
+        "total_products": cube.product_count()
     }
 
 @router.get("/{product_name}")
@@ -70,8 +77,8 @@ async def get_product_details(product_name: str):
     if df.empty:
         raise HTTPException(status_code=404, detail="Dataset not loaded")
     
-    # Find product (case-insensitive search)
-    product_df = df[df['product_name'].str.contains(product_name, case=False, na=False)]
+    # Find product (normalized substring match, like the other name lookups)
+    product_df = df[df['product_name_norm'].str.contains(normalize_text(product_name), regex=False)]
     
     if product_df.empty:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -82,7 +89,7 @@ async def get_product_details(product_name: str):
     # Calculate statistics
     total_reviews = len(product_df)
     avg_rating = product_df['rating'].mean()
-    verified_reviews = (product_df['verified'].str.lower() == 'yes').sum()
+    verified_reviews = (product_df['verified_norm'] == 'yes').sum()
     
     # Rating distribution
     rating_dist = {}
@@ -124,26 +131,24 @@ async def get_products_by_category(category_name: str):
     if 'category' not in df.columns:
         raise HTTPException(status_code=404, detail="Category column not found")
     
-    # Find category (case-insensitive)
-    category_df = df[df['category'].str.contains(category_name, case=False, na=False)]
+    # Find category (case-insensitive, matched against distinct category names)
+    cube = dataset_cube()
+    categories = cube.categories_matching(category_name)
+    totals = cube.totals(categories)
     
-    if category_df.empty:
+    if totals.reviews == 0:
         raise HTTPException(status_code=404, detail="Category not found")
     
-    # Get unique products in this category
+    # Unique products in this category
     products_list = []
-    product_names = category_df['product_name'].unique()
-    
-    for product_name in product_names:
-        product_reviews = category_df[category_df['product_name'] == product_name]
-        avg_rating = product_reviews['rating'].mean()
-        review_count = len(product_reviews)
+    for product_name, stats in cube.by_product(categories).items():
+        avg_rating = stats.avg_rating
         
         products_list.append({
             "product_name": str(product_name),
-            "review_count": int(review_count),
+            "review_count": stats.reviews,
             "average_rating": float(avg_rating) if not pd.isna(avg_rating) else 0,
-            "verified_count": int((product_reviews['verified'].str.lower() == 'yes').sum())
+            "verified_count": stats.verified
         })
     
     # Sort by review count (descending)
@@ -152,8 +157,8 @@ async def get_products_by_category(category_name: str):
     return {
         "category": category_name,
         "total_products": len(products_list),
-        "total_reviews": len(category_df),
-        "average_category_rating": float(category_df['rating'].mean()) if not pd.isna(category_df['rating'].mean()) else 0,
+        "total_reviews": totals.reviews,
+        "average_category_rating": float(totals.avg_rating) if not pd.isna(totals.avg_rating) else 0,
         "products": products_list
     }
 
@@ -162,30 +167,18 @@ async def search_products(
     query: str = Query(..., min_length=2),
     limit: int = Query(20, ge=1, le=100)
 ):
-    """Search products by name"""
-    df = load_dataset()
-    if df.empty:
+    """Search products by name (typo-tolerant, ranked)"""
+    index = get_product_index()
+    if not index.names:
         raise HTTPException(status_code=404, detail="Dataset not loaded")
     
-    # Search in product names
-    mask = df['product_name'].str.contains(query, case=False, na=False)
-    matching_products = df[mask]['product_name'].unique()[:limit]
-    
-    results = []
-    for product_name in matching_products:
-        product_reviews = df[df['product_name'] == product_name]
-        avg_rating = product_reviews['rating'].mean()
-        
-        results.append({
-            "product_name": str(product_name),
-            "category": str(product_reviews.iloc[0].get('category', 'Unknown')),
-            "review_count": len(product_reviews),
-            "average_rating": float(avg_rating) if not pd.isna(avg_rating) else 0
-        })
+    # Trigram candidates only; summaries are precomputed per product
+    matches = index.search(query, limit)
+    results = matches["results"]
     
     return {
         "query": query,
         "results": results,
         "count": len(results),
-        "total_matches": len(df[mask]['product_name'].unique())
+        "total_matches": matches["total_matches"]
     }
\ No newline at end of file
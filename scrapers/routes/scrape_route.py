@@ -5,6 +5,9 @@ import pandas as pd
 from datetime import datetime
 import json
 import os
+from services.aggregate_cube import dataset_cube, ranked
+from services.dataset_provider import latest_master_dataset, load_dataset
+from services.text_normalize import without_normalized_columns
 
 router = APIRouter(prefix="/api/scrape", tags=["Scraping"])
 
@@ -21,39 +24,40 @@ async def get_scraping_status():
                 "dataset_loaded": False
             }
         
-        csv_files = [f for f in os.listdir(data_dir) if f.startswith('flipkart_MASTER_DATASET_') and f.endswith('.csv')]
+        latest_file = latest_master_dataset(data_dir)
         
-        if not csv_files:
+        if latest_file is None:
             return {
                 "status": "no_data",
                 "message": "No master dataset found",
                 "dataset_loaded": False
             }
         
-        # Get latest file
-        latest_file = max(csv_files, key=lambda x: os.path.getctime(os.path.join(data_dir, x)))
         file_path = os.path.join(data_dir, latest_file)
         
-        # Load dataset for stats
-        df = pd.read_csv(file_path, encoding='utf-8-sig')
+        # Shared parsed copy and its aggregate cube (rebuilt only when the file changes)
+        df = load_dataset(file_path)
+        cube = dataset_cube(file_path)
+        totals = cube.totals()
+        category_counts = {category: stats.reviews for category, stats in cube.by_category().items()}
         
         return {
             "status": "loaded",
             "dataset_loaded": True,
             "dataset_info": {
                 "file_name": latest_file,
-                "total_reviews": len(df),
-                "total_products": df['product_name'].nunique(),
-                "categories": df['category'].nunique() if 'category' in df.columns else 0,
+                "total_reviews": totals.reviews,
+                "total_products": cube.product_count(),
+                "categories": len([c for c in category_counts if c is not None]) if 'category' in df.columns else 0,
                 "file_size_mb": os.path.getsize(file_path) / (1024 * 1024),
                 "last_modified": datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
             },
             "summary": {
-                "electronics_reviews": len(df[df['category'] == 'Electronics']) if 'category' in df.columns else 0,
-                "home_appliance_reviews": len(df[df['category'] == 'Home Appliance']) if 'category' in df.columns else 0,
-                "shoes_reviews": len(df[df['category'] == 'Shoes']) if 'category' in df.columns else 0,
-                "average_rating": float(df['rating'].mean()) if 'rating' in df.columns else 0,
-                "verified_reviews": int((df['verified'].str.lower() == 'yes').sum()) if 'verified' in df.columns else 0
+                "electronics_reviews": category_counts.get('Electronics', 0) if 'category' in df.columns else 0,
+                "home_appliance_reviews": category_counts.get('Home Appliance', 0) if 'category' in df.columns else 0,
+                "shoes_reviews": category_counts.get('Shoes', 0) if 'category' in df.columns else 0,
+                "average_rating": float(totals.avg_rating) if 'rating' in df.columns else 0,
+                "verified_reviews": totals.verified if 'verified' in df.columns else 0
             }
         }
         
@@ -107,15 +111,15 @@ async def export_dataset(format: str = "csv"):
     try:
         # Find latest dataset
         data_dir = "data"
-        csv_files = [f for f in os.listdir(data_dir) if f.startswith('flipkart_MASTER_DATASET_') and f.endswith('.csv')]
+        latest_file = latest_master_dataset(data_dir)
         
-        if not csv_files:
+        if latest_file is None:
             raise HTTPException(status_code=404, detail="No dataset found")
         
-        latest_file = max(csv_files, key=lambda x: os.path.getctime(os.path.join(data_dir, x)))
         file_path = os.path.join(data_dir, latest_file)
         
-        df = pd.read_csv(file_path, encoding='utf-8-sig')
+        # Exported as stored: without the normalized shadow columns
+        df = without_normalized_columns(load_dataset(file_path))
         
         if format.lower() == "json":
             return {
@@ -142,32 +146,34 @@ async def get_dataset_summary():
     """Get comprehensive dataset summary"""
     try:
         # Load dataset
-        df = pd.read_csv("data/flipkart_MASTER_DATASET_20251205_161226.csv", encoding='utf-8-sig')
+        df = load_dataset()
         
         if df.empty:
             raise HTTPException(status_code=404, detail="Dataset empty")
         
-        # Calculate various statistics
-        total_reviews = len(df)
-        total_products = df['product_name'].nunique()
+        cube = dataset_cube()
+        totals = cube.totals()
+        total_reviews = totals.reviews
+        total_products = cube.product_count()
         
         # Category breakdown
         category_breakdown = {}
         if 'category' in df.columns:
-            for category in df['category'].unique():
-                category_df = df[df['category'] == category]
+            products_by_category = cube.products_by_category()
+            for category, stats in cube.by_category().items():
                 category_breakdown[str(category)] = {
-                    "reviews": len(category_df),
-                    "products": category_df['product_name'].nunique(),
-                    "avg_rating": float(category_df['rating'].mean()),
-                    "verified_reviews": int((category_df['verified'].str.lower() == 'yes').sum())
+                    "reviews": stats.reviews,
+                    "products": len(products_by_category.get(category, {})),
+                    "avg_rating": float(stats.avg_rating),
+                    "verified_reviews": stats.verified
                 }
         
         # Rating analysis
         rating_analysis = {}
         if 'rating' in df.columns:
+            rating_counts = cube.rating_counts()
             for rating in range(1, 6):
-                count = (df['rating'] == rating).sum()
+                count = rating_counts.get(rating, 0)
                 percentage = (count / total_reviews) * 100
                 rating_analysis[str(rating)] = {
                     "count": int(count),
@@ -178,20 +184,20 @@ async def get_dataset_summary():
         # Top products
         top_products = []
         if 'product_name' in df.columns:
-            product_counts = df['product_name'].value_counts().head(10)
-            for product, count in product_counts.items():
-                product_df = df[df['product_name'] == product]
+            by_product = cube.by_product()
+            product_counts = ranked({product: stats.reviews for product, stats in by_product.items()}, 10)
+            for product, count in product_counts:
                 top_products.append({
                     "product": str(product),
                     "reviews": int(count),
-                    "avg_rating": float(product_df['rating'].mean()),
-                    "category": str(product_df.iloc[0].get('category', 'Unknown'))
+                    "avg_rating": float(by_product[product].avg_rating),
+                    "category": str(cube.product_category.get(product)) if 'category' in df.columns else 'Unknown'
                 })
         
         # Verified analysis
         verified_stats = {}
         if 'verified' in df.columns:
-            verified_count = (df['verified'].str.lower() == 'yes').sum()
+            verified_count = totals.verified
             verified_stats = {
                 "verified": int(verified_count),
                 "non_verified": int(total_reviews - verified_count),
@@ -203,16 +209,16 @@ async def get_dataset_summary():
                 "total_reviews": total_reviews,
                 "total_products": total_products,
                 "categories_count": len(category_breakdown),
-                "overall_avg_rating": float(df['rating'].mean()),
+                "overall_avg_rating": float(totals.avg_rating),
                 "data_collection_period": "December 2025",
-                "scrape_phases": list(df['scrape_phase'].unique()) if 'scrape_phase' in df.columns else ["Unknown"]
+                "scrape_phases": list(cube.scrape_phases) if 'scrape_phase' in df.columns else ["Unknown"]
             },
             "category_breakdown": category_breakdown,
             "rating_analysis": rating_analysis,
             "top_products": top_products,
             "verified_stats": verified_stats,
             "data_quality": {
-                "missing_ratings": int(df['rating'].isnull().sum()),
+                "missing_ratings": cube.rating_counts().get(None, 0),
                 "missing_reviews": int(df['review_text'].isnull().sum()),
                 "duplicate_reviews": int(df.duplicated(subset=['review_text']).sum()) if 'review_text' in df.columns else 0
             }
@@ -0,0 +1,272 @@
+# search_benchmark.py
+"""Search latency benchmark over synthetic Flipkart-shaped corpora.
+
+Usage:
+    python search_benchmark.py                      # 10k, 100k and 1M reviews
+    python search_benchmark.py --sizes 10000 50000 --queries 100 --output run.json
+"""
+import argparse
+import glob
+import json
+import platform
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+import pandas as pd
+
+from services.search_index import SearchIndex, tokenize
+from services.text_normalize import add_normalized_columns, normalize_text
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+SEARCH_LIMIT = 20
+
+
+# -------------------------------------------------------------
+# Synthetic corpus
+# -------------------------------------------------------------
+def load_seed_dataset() -> pd.DataFrame:
+    """The newest master dataset, used for column shapes and vocabulary"""
+    files = sorted(glob.glob("data/flipkart_MASTER_DATASET_*.csv"))
+    if not files:
+        raise SystemExit("❌ No data/flipkart_MASTER_DATASET_*.csv to model the corpus on")
+    return pd.read_csv(files[-1], encoding="utf-8-sig")
+
+
+def build_corpus(seed: pd.DataFrame, rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """`rows` reviews sampled column by column from the seed dataset.
+
+    Review text is drawn word by word from the seed vocabulary with its own
+    frequencies (so common words stay common) and the seed's length spread.
+    """
+    counts = Counter(token for text in seed["review_text"].astype(str) for token in tokenize(text))
+    words = np.array(list(counts))
+    weights = np.array(list(counts.values()), dtype=np.float64)
+    weights /= weights.sum()
+
+    lengths = np.array([max(len(tokenize(text)), 1) for text in seed["review_text"].astype(str)])
+    review_lengths = rng.choice(lengths, size=rows)
+    drawn = rng.choice(words, size=int(review_lengths.sum()), p=weights)
+    cuts = np.concatenate(([0], np.cumsum(review_lengths)))
+    texts = [" ".join(drawn[cuts[i]:cuts[i + 1]]) for i in range(rows)]
+
+    picks = rng.integers(0, len(seed), size=rows)
+    df = pd.DataFrame({
+        "review_id": np.arange(1, rows + 1),
+        "category": seed["category"].to_numpy()[picks],
+        "product_name": seed["product_name"].to_numpy()[rng.integers(0, len(seed), size=rows)],
+        "rating": rng.integers(1, 6, size=rows),
+        "review_text": texts,
+        "reviewer": seed["reviewer"].to_numpy()[rng.integers(0, len(seed), size=rows)],
+        "verified": seed["verified"].to_numpy()[picks],
+    })
+    return df
+
+
+def build_queries(df: pd.DataFrame, count: int, rng: np.random.Generator) -> Dict[str, List[str]]:
+    """Query mix per kind, drawn from the corpus itself"""
+    sample = df["review_text"].sample(n=min(len(df), 5000), random_state=int(rng.integers(1 << 31)))
+    counts = Counter(token for text in sample for token in tokenize(text))
+    ranked = [token for token, _ in counts.most_common() if len(token) > 1]
+
+    common = ranked[:10]
+    middle = ranked[10:200] or common
+    rare = [token for token, n in counts.items() if n <= 2 and len(token) > 2] or ranked[-20:]
+
+    pairs = []
+    for text in sample.head(500):
+        tokens = tokenize(text)
+        if len(tokens) >= 2:
+            start = int(rng.integers(0, len(tokens) - 1))
+            pairs.append(" ".join(tokens[start:start + 2]))
+
+    def draw(pool: List[str]) -> List[str]:
+        return [pool[i] for i in rng.integers(0, len(pool), size=count)]
+
+    return {
+        "single_term": draw(middle),
+        "multi_term": draw(pairs),
+        "rare": draw(rare),
+        "very_common": draw(common),
+        "phrase": ['"' + pair + '"' for pair in draw(pairs)],
+    }
+
+
+# -------------------------------------------------------------
+# Strategies
+# -------------------------------------------------------------
+def scan_lower(df: pd.DataFrame) -> Callable[[str], Any]:
+    """The original search: lowercase every text column per query"""
+    def search(query: str):
+        needle = query.lower()
+        mask = (
+            df["review_text"].str.lower().str.contains(needle, regex=False) |
+            df["product_name"].str.lower().str.contains(needle, regex=False) |
+            df["category"].str.lower().str.contains(needle, regex=False) |
+            df["reviewer"].str.lower().str.contains(needle, regex=False)
+        )
+        return np.flatnonzero(mask.to_numpy())[:SEARCH_LIMIT]
+    return search
+
+
+def scan_normalized(df: pd.DataFrame) -> Callable[[str], Any]:
+    """Substring scan over the precomputed shadow columns"""
+    def search(query: str):
+        needle = normalize_text(query)
+        mask = (
+            df["review_text_norm"].str.contains(needle, regex=False) |
+            df["product_name_norm"].str.contains(needle, regex=False) |
+            df["category_norm"].str.contains(needle, regex=False) |
+            df["reviewer_norm"].str.contains(needle, regex=False)
+        )
+        return np.flatnonzero(mask.to_numpy())[:SEARCH_LIMIT]
+    return search
+
+
+def indexed(index: SearchIndex, rank=None) -> Callable[[str], Any]:
+    return lambda query: index.search(query, SEARCH_LIMIT, rank=rank)
+
+
+# -------------------------------------------------------------
+# Measurement
+# -------------------------------------------------------------
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p95_ms": round(float(np.percentile(values, 95)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4),
+        "mean_ms": round(float(values.mean()), 4),
+    }
+
+
+def replay(search: Callable[[str], Any], queries: Dict[str, List[str]]) -> Dict[str, Any]:
+    by_kind, everything = {}, []
+    for kind, batch in queries.items():
+        timings = []
+        for query in batch:
+            start = time.perf_counter()
+            search(query)
+            timings.append(time.perf_counter() - start)
+        by_kind[kind] = percentiles(timings)
+        everything.extend(timings)
+    return {"overall": percentiles(everything), "by_kind": by_kind}
+
+
+def index_memory_mb(index: SearchIndex) -> float:
+    """Bytes held by the index itself: posting arrays plus container overhead.
+
+    Field values in `documents` are shared with the frame, so only the tuples count.
+    """
+    total = sys.getsizeof(index.documents) + sum(sys.getsizeof(doc) for doc in index.documents)
+    total += sys.getsizeof(index.vocabulary)
+    for mapping in (index.postings, index.occurrences, index.occurrence_offsets, index.term_weights):
+        total += sys.getsizeof(mapping)
+        total += sum(sys.getsizeof(token) + array.nbytes for token, array in mapping.items())
+    return round(total / (1024 * 1024), 2)
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def measure_build(df: pd.DataFrame) -> Dict[str, Any]:
+    """Build the shadow columns and the search index, timing and sizing each"""
+    start = time.perf_counter()
+    add_normalized_columns(df)
+    normalize_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    index.build(df)
+    build_seconds = time.perf_counter() - start
+
+    return {
+        "index": index,
+        "normalize_seconds": round(normalize_seconds, 3),
+        "index_build_seconds": round(build_seconds, 3),
+        "vocabulary": len(index.vocabulary),
+        "index_memory_mb": index_memory_mb(index),
+        "process_peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run(sizes: List[int], query_count: int, scan_max_rows: int, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    seed_df = load_seed_dataset()
+    results = []
+
+    for rows in sizes:
+        print(f"\n📦 Building corpus of {rows:,} reviews...")
+        start = time.perf_counter()
+        df = build_corpus(seed_df, rows, rng)
+        corpus_seconds = time.perf_counter() - start
+
+        build = measure_build(df)
+        index = build.pop("index")
+        print(f"🔨 Index built in {build['index_build_seconds']}s")
+
+        queries = build_queries(df, query_count, rng)
+        strategies = {"index": indexed(index), "index_bm25": indexed(index, "bm25")}
+        if rows <= scan_max_rows:
+            strategies["scan_lower"] = scan_lower(df)
+            strategies["scan_normalized"] = scan_normalized(df)
+
+        timings = {}
+        for name, search in strategies.items():
+            print(f"⏱️  Replaying {sum(map(len, queries.values()))} queries against {name}...")
+            timings[name] = replay(search, queries)
+            print(f"   p50 {timings[name]['overall']['p50_ms']} ms, p99 {timings[name]['overall']['p99_ms']} ms")
+
+        results.append({
+            "rows": rows,
+            "corpus_seconds": round(corpus_seconds, 3),
+            "build": build,
+            "strategies": timings,
+        })
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "queries_per_kind": query_count,
+        "search_limit": SEARCH_LIMIT,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /search strategies on synthetic corpora")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Corpus sizes (reviews)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per kind")
+    parser.add_argument("--scan-max-rows", type=int, default=100_000,
+                        help="Skip the full-scan strategies above this corpus size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=f"search_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("🏁 SEARCH BENCHMARK")
+    print("=" * 70)
+
+    report = run(args.sizes, args.queries, args.scan_max_rows, args.seed)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+# backend/services/aggregate_cube.py
+import math
+import threading
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from services.dataset_provider import DATASET_PATH, get_provider
+from services.text_normalize import norm_column, normalize_series, normalize_text
+
+# (category, product_name, rating, normalized verified); missing values are None ("" for verified)
+Cell = Tuple[Any, Any, Any, str]
+
+
+@dataclass
+class Totals:
+    """Review count, rated-review count, rating sum and verified count of one slice"""
+    reviews: int = 0
+    rated: int = 0
+    rating_sum: float = 0.0
+    verified: int = 0
+
+    def add(self, rating: Any, verified: bool, count: int):
+        self.reviews += count
+        if rating is not None:
+            self.rated += count
+            self.rating_sum += rating * count
+        if verified:
+            self.verified += count
+
+    def merge(self, other: "Totals"):
+        self.reviews += other.reviews
+        self.rated += other.rated
+        self.rating_sum += other.rating_sum
+        self.verified += other.verified
+
+    @property
+    def avg_rating(self) -> float:
+        """Mean over rated reviews (NaN when none are rated, like Series.mean)"""
+        return self.rating_sum / self.rated if self.rated else float("nan")
+
+
+@dataclass
+class TextTotals:
+    """Review-text length and word figures of one category"""
+    reviews: int = 0
+    length_sum: int = 0
+    words: int = 0
+    min_length: Optional[int] = None
+    max_length: Optional[int] = None
+
+    def merge(self, reviews: int, length_sum: int, words: int, min_length: int, max_length: int):
+        self.reviews += reviews
+        self.length_sum += length_sum
+        self.words += words
+        self.min_length = min_length if self.min_length is None else min(self.min_length, min_length)
+        self.max_length = max_length if self.max_length is None else max(self.max_length, max_length)
+
+
+def _value(value: Any) -> Any:
+    """Plain Python scalar for a cube key (None for missing)"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def rated_counts(counts: Dict[Any, int]) -> List[Tuple[Any, int]]:
+    """(rating, count) pairs of a rating histogram in ascending order, unrated (None) dropped"""
+    return sorted((rating, count) for rating, count in counts.items() if rating is not None and count)
+
+
+def histogram_median(counts: Dict[Any, int]) -> float:
+    """Median rating of a histogram (like Series.median; NaN when nothing is rated)"""
+    pairs = rated_counts(counts)
+    total = sum(count for _, count in pairs)
+    if not total:
+        return float("nan")
+    # 0-based ranks of the middle value(s)
+    wanted = sorted({(total - 1) // 2, total // 2})
+    values = []
+    seen = 0
+    for rating, count in pairs:
+        seen += count
+        while wanted and wanted[0] < seen:
+            values.append(rating)
+            wanted.pop(0)
+    return float(sum(values) / len(values))
+
+
+def histogram_mode(counts: Dict[Any, int]) -> Optional[Any]:
+    """Most frequent rating, the smallest one on ties (like Series.mode()[0]); None when nothing is rated"""
+    pairs = rated_counts(counts)
+    if not pairs:
+        return None
+    top = max(count for _, count in pairs)
+    return next(rating for rating, count in pairs if count == top)
+
+
+def histogram_std(counts: Dict[Any, int]) -> float:
+    """Sample standard deviation of a histogram (like Series.std, ddof=1)"""
+    pairs = rated_counts(counts)
+    total = sum(count for _, count in pairs)
+    if total < 2:
+        return float("nan")
+    mean = sum(rating * count for rating, count in pairs) / total
+    squares = sum((rating - mean) ** 2 * count for rating, count in pairs)
+    return math.sqrt(squares / (total - 1))
+
+
+def ranked(counts: Dict[Hashable, int], n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+    """(key, count) pairs ordered like value_counts() over the underlying rows.
+
+    `counts` must be in first-appearance order; sorting it the same way
+    value_counts does keeps tie order identical.
+    """
+    if not counts:
+        return []
+    series = pd.Series(list(counts.values()), index=pd.Index(list(counts.keys()), dtype=object), dtype="int64")
+    series = series.sort_values(ascending=False)
+    if n is not None:
+        series = series.head(n)
+    return [(key, int(count)) for key, count in series.items()]
+
+
+class AggregateCube:
+    """Review counts per (category, product, rating, verified) cell, kept up to date per review.
+
+    The analytics routes and the DataLoader stats read their counts and rating
+    figures from here instead of from the rows. Rating sums, medians, modes and
+    spreads follow from the rating dimension, so every figure they report (per
+    category, per product, rating histograms, verified split) is a pass over
+    the cells: its cost depends on how many distinct combinations exist, not on
+    how many reviews there are. Adding a review touches one cell.
+    """
+
+    def __init__(self):
+        self.cells: Dict[Cell, int] = {}
+        self.product_category: Dict[Any, Any] = {}
+        # Reviews per category in first-appearance order (what ranked() expects)
+        self.category_reviews: Dict[Any, int] = {}
+        self.text: Dict[Any, TextTotals] = {}
+        self.scrape_phases: List[Any] = []
+        self.version = 0
+        self._phases_seen: Set[Any] = set()
+        self._rollups: Dict[Any, Tuple[int, Any]] = {}
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------
+    # Build / update
+    # -------------------------------------------------------------
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "AggregateCube":
+        cube = cls()
+        cube.build(df)
+        return cube
+
+    def build(self, df: pd.DataFrame):
+        """One grouped pass over the frame"""
+        self.cells, self.product_category, self.text = {}, {}, {}
+        self.category_reviews = {}
+        self.scrape_phases, self._phases_seen = [], set()
+        self._rollups = {}
+        self.version += 1
+        if df.empty:
+            return
+
+        missing = pd.Series(None, index=df.index, dtype=object)
+        verified_column = norm_column("verified")
+        if verified_column in df.columns:
+            verified = df[verified_column]
+        elif "verified" in df.columns:
+            verified = normalize_series(df["verified"])
+        else:
+            verified = pd.Series("", index=df.index, dtype=object)
+
+        keys = pd.DataFrame({
+            "category": df["category"] if "category" in df.columns else missing,
+            "product_name": df["product_name"] if "product_name" in df.columns else missing,
+            "rating": df["rating"] if "rating" in df.columns else missing,
+            "verified": verified,
+        })
+        sizes = keys.groupby(list(keys.columns), sort=False, dropna=False).size()
+        for (category, product, rating, is_verified), count in sizes.items():
+            cell = (_value(category), _value(product), _value(rating), is_verified)
+            self.cells[cell] = self.cells.get(cell, 0) + int(count)
+        for (category, *_), count in self.cells.items():
+            self.category_reviews[category] = self.category_reviews.get(category, 0) + count
+
+        firsts = keys[["product_name", "category"]].drop_duplicates("product_name")
+        for product, category in zip(firsts["product_name"], firsts["category"]):
+            self.product_category[_value(product)] = _value(category)
+
+        if "review_text" in df.columns:
+            texts = df["review_text"].astype(str)
+            lengths = pd.DataFrame({
+                "category": keys["category"],
+                "length": texts.str.len(),
+                "words": texts.str.split().str.len(),
+            }).groupby("category", sort=False, dropna=False).agg(
+                reviews=("length", "size"),
+                length_sum=("length", "sum"),
+                words=("words", "sum"),
+                min_length=("length", "min"),
+                max_length=("length", "max"),
+            )
+            for category, row in lengths.iterrows():
+                self.text.setdefault(_value(category), TextTotals()).merge(
+                    int(row["reviews"]), int(row["length_sum"]), int(row["words"]),
+                    int(row["min_length"]), int(row["max_length"])
+                )
+
+        if "scrape_phase" in df.columns:
+            for phase in df["scrape_phase"].unique():
+                self._add_phase(phase)
+
+    def add(self, row: Dict[str, Any]):
+        """Count one new review: O(1)"""
+        category = _value(row.get("category"))
+        product = _value(row.get("product_name"))
+        rating = _value(pd.to_numeric(row.get("rating"), errors="coerce"))
+        verified = row.get(norm_column("verified"))
+        if verified is None:
+            verified = normalize_text(row.get("verified"))
+
+        with self._lock:
+            cell = (category, product, rating, verified)
+            self.cells[cell] = self.cells.get(cell, 0) + 1
+            self.product_category.setdefault(product, category)
+            self.category_reviews[category] = self.category_reviews.get(category, 0) + 1
+
+            text = str(row.get("review_text"))
+            length = len(text)
+            self.text.setdefault(category, TextTotals()).merge(1, length, len(text.split()), length, length)
+
+            if "scrape_phase" in row:
+                self._add_phase(row["scrape_phase"])
+            self.version += 1
+
+    def _add_phase(self, phase: Any):
+        key = None if pd.isna(phase) else phase
+        if key not in self._phases_seen:
+            self._phases_seen.add(key)
+            self.scrape_phases.append(phase)
+
+    # -------------------------------------------------------------
+    # Rollups
+    # -------------------------------------------------------------
+    def _rollup(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Unfiltered rollups are memoized until the next update"""
+        cached = self._rollups.get(name)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        value = compute()
+        self._rollups[name] = (self.version, value)
+        return value
+
+    def _cells_by_category(self) -> Dict[Any, List[Tuple[int, Cell, int]]]:
+        """(sequence, cell, count) per category, sequence being the cell's insertion order"""
+        def compute():
+            by_category: Dict[Any, List[Tuple[int, Cell, int]]] = {}
+            for sequence, (cell, count) in enumerate(list(self.cells.items())):
+                by_category.setdefault(cell[0], []).append((sequence, cell, count))
+            return by_category
+        return self._rollup("category_cells", compute)
+
+    def _selected(self, categories: Optional[Set[Any]]) -> Iterable[Tuple[Cell, int]]:
+        """Cells of the given categories (all when None), in insertion order"""
+        if categories is None:
+            return list(self.cells.items())
+        by_category = self._cells_by_category()
+        selected = [entry for category in categories for entry in by_category.get(category, ())]
+        # Sorting by sequence keeps first-appearance order across categories
+        selected.sort(key=itemgetter(0))
+        return ((cell, count) for _, cell, count in selected)
+
+    def _group(self, key: Callable[[Cell], Any], categories: Optional[Set[Any]] = None) -> Dict[Any, Totals]:
+        groups: Dict[Any, Totals] = {}
+        for cell, count in self._selected(categories):
+            group = key(cell)
+            totals = groups.get(group)
+            if totals is None:
+                totals = groups[group] = Totals()
+            totals.add(cell[2], cell[3] == "yes", count)
+        return groups
+
+    def totals(self, categories: Optional[Set[Any]] = None) -> Totals:
+        if categories is None:
+            return self._rollup("totals", lambda: self._group(lambda cell: None).get(None, Totals()))
+        return self._group(lambda cell: None, categories).get(None, Totals())
+
+    def by_category(self) -> Dict[Any, Totals]:
+        """Totals per category, in first-appearance order"""
+        return self._rollup("category", lambda: self._group(lambda cell: cell[0]))
+
+    def by_product(self, categories: Optional[Set[Any]] = None) -> Dict[Any, Totals]:
+        """Totals per product (missing names skipped), in first-appearance order"""
+        if categories is None:
+            groups = self._rollup("product", lambda: self._group(lambda cell: cell[1]))
+        else:
+            groups = self._group(lambda cell: cell[1], categories)
+        return {product: totals for product, totals in groups.items() if product is not None}
+
+    def by_verified(self) -> Dict[str, Totals]:
+        """Totals per normalized verified value"""
+        return self._rollup("verified", lambda: self._group(lambda cell: cell[3]))
+
+    def products_by_category(self) -> Dict[Any, Dict[Any, Totals]]:
+        """Per category, totals per product, both in first-appearance order"""
+        def compute():
+            nested: Dict[Any, Dict[Any, Totals]] = {}
+            for (category, product), totals in self._group(lambda cell: (cell[0], cell[1])).items():
+                if product is not None:
+                    nested.setdefault(category, {})[product] = totals
+            return nested
+        return self._rollup("category_product", compute)
+
+    def rating_counts(self, categories: Optional[Set[Any]] = None) -> Dict[Any, int]:
+        """Reviews per rating value (None collects unrated reviews)"""
+        if categories is None:
+            groups = self._rollup("rating", lambda: self._group(lambda cell: cell[2]))
+        else:
+            groups = self._group(lambda cell: cell[2], categories)
+        return {rating: totals.reviews for rating, totals in groups.items()}
+
+    def _rating_counts_by(self, key: Callable[[Cell], Any]) -> Dict[Any, Dict[Any, int]]:
+        nested: Dict[Any, Dict[Any, int]] = {}
+        for cell, count in self._selected(None):
+            counts = nested.setdefault(key(cell), {})
+            counts[cell[2]] = counts.get(cell[2], 0) + count
+        return nested
+
+    def rating_counts_by_category(self) -> Dict[Any, Dict[Any, int]]:
+        """Per category (first-appearance order), reviews per rating value"""
+        return self._rollup("category_rating", lambda: self._rating_counts_by(lambda cell: cell[0]))
+
+    def rating_counts_by_verified(self) -> Dict[str, Dict[Any, int]]:
+        """Per normalized verified value ("yes", "no", ...), reviews per rating value"""
+        return self._rollup("verified_rating", lambda: self._rating_counts_by(lambda cell: cell[3]))
+
+    def product_count(self, categories: Optional[Set[Any]] = None) -> int:
+        """Distinct product names (like nunique)"""
+        return len(self.by_product(categories))
+
+    def text_totals(self, categories: Optional[Iterable[Any]] = None) -> TextTotals:
+        selected = self.text.keys() if categories is None else [c for c in categories if c in self.text]
+        combined = TextTotals()
+        for category in list(selected):
+            part = self.text[category]
+            combined.merge(part.reviews, part.length_sum, part.words, part.min_length, part.max_length)
+        return combined
+
+    def categories_matching(self, pattern: str) -> Set[Any]:
+        """Categories matched by `str.contains(pattern, case=False)`, evaluated per distinct value"""
+        names = [category for category in self.by_category() if category is not None]
+        if not names:
+            return set()
+        mask = pd.Series(names, dtype=object).str.contains(pattern, case=False, na=False)
+        return {name for name, matched in zip(names, mask) if matched}
+
+
+def dataset_cube(path: str = DATASET_PATH) -> AggregateCube:
+    """The cube for a dataset file, rebuilt only when the file changes"""
+    return get_provider(path).derived("aggregate_cube", AggregateCube.from_frame)
@@ -0,0 +1,98 @@
+# backend/services/dataset_provider.py
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from services.text_normalize import add_normalized_columns
+
+DATA_DIR = "data"
+DATASET_PATH = os.path.join(DATA_DIR, "flipkart_MASTER_DATASET_20251205_161226.csv")
+
+
+class DatasetProvider:
+    """One parsed copy of a dataset CSV per process, re-read only when the file changes.
+
+    Routers share the returned frame, so they must treat it as read-only.
+    Values derived from it (indexes, aggregates) can be memoized with
+    `derived`; they are dropped whenever the file is re-read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version = 0
+        self._df: Optional[pd.DataFrame] = None
+        self._fingerprint: Optional[Tuple[int, int]] = None
+        self._derived: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self) -> pd.DataFrame:
+        """The cleaned frame for the file as it is on disk now"""
+        fingerprint = self.fingerprint()
+        if self._df is not None and fingerprint is not None and fingerprint == self._fingerprint:
+            return self._df
+
+        with self._lock:
+            if self._df is None or fingerprint is None or fingerprint != self._fingerprint:
+                self._df = self._read()
+                # A failed read is retried on the next call
+                self._fingerprint = fingerprint if not self._df.empty else None
+                self._derived = {}
+                self.version += 1
+            return self._df
+
+    def _read(self) -> pd.DataFrame:
+        try:
+            df = pd.read_csv(self.path, encoding='utf-8-sig')
+        except Exception as e:
+            print(f"Error loading dataset: {e}")
+            return pd.DataFrame()
+
+        if 'rating' in df.columns:
+            df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
+        print(f"📂 Parsed {len(df)} rows from {self.path}")
+        return add_normalized_columns(df)
+
+    def derived(self, name: str, build: Callable[[pd.DataFrame], Any]) -> Any:
+        """`build(frame)` computed once per file version"""
+        df = self.get()
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build(df)
+            return self._derived[name]
+
+
+_providers: Dict[str, DatasetProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(path: str = DATASET_PATH) -> DatasetProvider:
+    """The process-wide provider for a dataset file"""
+    key = os.path.normpath(path)
+    with _providers_lock:
+        if key not in _providers:
+            _providers[key] = DatasetProvider(path)
+        return _providers[key]
+
+
+def load_dataset(path: str = DATASET_PATH) -> pd.DataFrame:
+    """Shared, read-only frame for the master dataset"""
+    return get_provider(path).get()
+
+
+def latest_master_dataset(data_dir: str = DATA_DIR) -> Optional[str]:
+    """Newest flipkart_MASTER_DATASET_*.csv in data_dir (by ctime)"""
+    if not os.path.exists(data_dir):
+        return None
+    csv_files = [f for f in os.listdir(data_dir) if f.startswith('flipkart_MASTER_DATASET_') and f.endswith('.csv')]
+    if not csv_files:
+        return None
+    return max(csv_files, key=lambda x: os.path.getctime(os.path.join(data_dir, x)))
@@ -0,0 +1,84 @@
+# backend/services/frame_store.py
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# The tail is folded into the base once it holds this many rows and 1/FOLD_FRACTION of the base
+FOLD_MIN_ROWS = 1024
+FOLD_FRACTION = 8
+
+
+class FrameStore:
+    """A base frame plus the rows appended since, so an append never copies the base.
+
+    Length, single values and positional takes touch only the requested rows.
+    The whole frame is concatenated only when a caller asks for all of it, and
+    the tail is folded into the base once it outgrows a fixed fraction of it,
+    so appending stays amortized O(1) per row.
+    """
+
+    def __init__(self, base: Optional[pd.DataFrame] = None):
+        # (base frame, appended rows); replaced as a pair, so readers see a consistent view
+        self._parts: Tuple[Optional[pd.DataFrame], List[Dict[str, Any]]] = (base, [])
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        base, tail = self._parts
+        return (0 if base is None else len(base)) + len(tail)
+
+    def append(self, row: Dict[str, Any]):
+        with self._lock:
+            base, tail = self._parts
+            tail.append(row)
+            base_rows = 0 if base is None else len(base)
+            if len(tail) >= max(FOLD_MIN_ROWS, base_rows // FOLD_FRACTION):
+                self._parts = (self._combine(base, tail), [])
+
+    @staticmethod
+    def _combine(base: Optional[pd.DataFrame], tail: List[Dict[str, Any]]) -> Optional[pd.DataFrame]:
+        if not tail:
+            return base
+        new_rows = pd.DataFrame(tail)
+        if base is None or base.empty:
+            return new_rows
+        return pd.concat([base, new_rows], ignore_index=True)
+
+    def frame(self) -> Optional[pd.DataFrame]:
+        """The whole frame (folds the tail in, so only the first read after appends pays for it)"""
+        base, tail = self._parts
+        if not tail:
+            return base
+        with self._lock:
+            base, tail = self._parts
+            if tail:
+                self._parts = (self._combine(base, tail), [])
+            return self._parts[0]
+
+    def value(self, position: int, column: str) -> Any:
+        """One cell by row position"""
+        base, tail = self._parts
+        base_rows = 0 if base is None else len(base)
+        if position < base_rows:
+            return base[column].iat[position]
+        return tail[position - base_rows].get(column)
+
+    def take(self, positions: Iterable[int]) -> pd.DataFrame:
+        """Rows at the given positions, in the given order"""
+        base, tail = self._parts
+        positions = np.asarray(positions, dtype=np.int64)
+        base_rows = 0 if base is None else len(base)
+        if base is not None and (len(positions) == 0 or positions.max() < base_rows):
+            return base.iloc[positions]
+
+        in_base = positions < base_rows
+        parts = [pd.DataFrame([tail[position - base_rows] for position in positions[~in_base]])]
+        if base is not None and in_base.any():
+            parts.insert(0, base.iloc[positions[in_base]])
+        rows = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+        # Back to request order (base rows were gathered first)
+        order = np.argsort(np.concatenate((np.flatnonzero(in_base), np.flatnonzero(~in_base))), kind="stable")
+        rows = rows.iloc[order]
+        rows.index = pd.Index(positions)
+        return rows
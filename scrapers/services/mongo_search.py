@@ -0,0 +1,103 @@
+# backend/services/mongo_search.py
+import re
+from typing import Any, Dict, List, Optional
+
+from services.query_parser import Node, is_structured, parse_query
+from services.search_index import FIELD_WEIGHTS, TEXT_FIELDS, tokenize
+
+TEXT_INDEX_NAME = "reviews_text"
+
+
+def _regex_filter(node: Node) -> Dict[str, Any]:
+    """Server-side word-boundary regex filter for query parts $text cannot express"""
+    kind = node[0]
+    if kind in ("term", "phrase"):
+        words = [node[2]] if kind == "term" else node[2]
+        pattern = r"\b" + r"\W+".join(re.escape(word) for word in words) + r"\b"
+        columns = [node[1]] if node[1] else TEXT_FIELDS
+        clauses = [{column: {"$regex": pattern, "$options": "i"}} for column in columns]
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+    if kind == "not":
+        return {"$nor": [_regex_filter(node[1])]}
+    return {"$" + kind: [_regex_filter(child) for child in node[1]]}
+
+
+def build_filter(query: str) -> Optional[Dict[str, Any]]:
+    """Translate a /search query into a MongoDB filter (None when nothing is searchable).
+
+    Unscoped words, phrases and negated words go into one $text search (quoted,
+    so $text ANDs them); field scoping and OR groups that $text cannot express
+    become regex conditions alongside it.
+    """
+    if not is_structured(query):
+        words = tokenize(query)
+        if not words:
+            return None
+        # One phrase: the closest $text match to "contains the query text"
+        search = words[0] if len(words) == 1 else '"' + " ".join(words) + '"'
+        return {"$text": {"$search": search}}
+
+    node = parse_query(query, tokenize)
+    if node is None:
+        return None
+    parts = node[1] if node[0] == "and" else [node]
+
+    positive, negative, conditions = [], [], []
+    for part in parts:
+        kind = part[0]
+        if kind == "term" and part[1] is None:
+            positive.append('"' + part[2] + '"')
+        elif kind == "phrase" and part[1] is None:
+            positive.append('"' + " ".join(part[2]) + '"')
+        elif kind == "not" and part[1][0] == "term" and part[1][1] is None:
+            negative.append("-" + part[1][2])
+        else:
+            conditions.append(_regex_filter(part))
+
+    if len(parts) == 1 and node[0] == "or" and all(c[0] == "term" and c[1] is None for c in node[1]):
+        # A plain OR of words is $text's native (unquoted) behaviour
+        return {"$text": {"$search": " ".join(child[2] for child in node[1])}}
+
+    if positive:
+        conditions.insert(0, {"$text": {"$search": " ".join(positive + negative)}})
+    else:
+        # $text needs at least one positive term
+        conditions.extend({"$nor": [_regex_filter(("term", None, n[1:]))]} for n in negative)
+
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+class MongoTextSearch:
+    """Search pushed down to the flipkart_reviews collection through a text index"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def ensure_index(self):
+        """Weighted text index over the searched fields (same weights as BM25F)"""
+        self.collection.create_index(
+            [(column, "text") for column in TEXT_FIELDS],
+            name=TEXT_INDEX_NAME,
+            weights={column: max(1, int(FIELD_WEIGHTS[column] * 2)) for column in TEXT_FIELDS},
+            default_language="english"
+        )
+
+    def search_ids(self, query: str, limit: int, rank: Optional[str] = None) -> Optional[List[int]]:
+        """review_ids of matching documents, by text score with rank="bm25" else by id"""
+        query_filter = build_filter(query)
+        if query_filter is None:
+            return None
+
+        has_text = "$text" in query_filter or any(
+            "$text" in condition for condition in query_filter.get("$and", [])
+        )
+        projection = {"_id": 0, "review_id": 1}
+        if rank == "bm25" and has_text:
+            projection["score"] = {"$meta": "textScore"}
+            cursor = self.collection.find(query_filter, projection).sort([("score", {"$meta": "textScore"})])
+        else:
+            cursor = self.collection.find(query_filter, projection).sort("review_id", 1)
+
+        return [int(doc["review_id"]) for doc in cursor.limit(limit) if doc.get("review_id") is not None]
@@ -0,0 +1,86 @@
+# backend/services/product_search.py
+import heapq
+from collections import defaultdict
+from typing import Any, Dict, List, Set
+
+import pandas as pd
+
+from services.text_normalize import normalize_text
+
+# Share of the query's trigrams a product name must contain to count as a match
+MIN_TRIGRAM_COVERAGE = 0.5
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of each word, padded so short words still produce some"""
+    grams = set()
+    for word in normalize_text(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class ProductTrigramIndex:
+    """Fuzzy product-name lookup over distinct names, with per-product summaries"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.normalized: List[str] = []
+        self.summaries: List[Dict[str, Any]] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+
+    def build(self, df: pd.DataFrame):
+        self.names, self.normalized, self.summaries = [], [], []
+        self.postings = defaultdict(list)
+        if df is None or df.empty or "product_name" not in df.columns:
+            return
+
+        # One grouped pass yields every per-product summary row
+        grouped = df.groupby("product_name", sort=False)
+        summary = grouped.agg(
+            review_count=("product_name", "size"),
+            average_rating=("rating", "mean"),
+            category=("category", "first"),
+        )
+
+        for product_id, (name, row) in enumerate(summary.iterrows()):
+            self.names.append(str(name))
+            self.normalized.append(normalize_text(name))
+            self.summaries.append({
+                "product_name": str(name),
+                "category": str(row["category"]) if pd.notnull(row["category"]) else "Unknown",
+                "review_count": int(row["review_count"]),
+                "average_rating": float(row["average_rating"]) if pd.notnull(row["average_rating"]) else 0
+            })
+            for gram in trigrams(name):
+                self.postings[gram].append(product_id)
+
+    def search(self, query: str, limit: int) -> Dict[str, Any]:
+        """Ranked product summaries for a possibly misspelled query"""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return {"results": [], "total_matches": 0}
+
+        # Count shared trigrams only for products that share at least one
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for product_id in self.postings.get(gram, ()):
+                shared[product_id] += 1
+
+        needle = normalize_text(query)
+        scored = []
+        for product_id, common in shared.items():
+            coverage = common / len(query_grams)
+            exact = needle in self.normalized[product_id]
+            if exact or coverage >= MIN_TRIGRAM_COVERAGE:
+                # Plain substring hits first, then by trigram coverage, then popularity
+                scored.append((exact, coverage, self.summaries[product_id]["review_count"], -product_id))
+
+        best = heapq.nlargest(limit, scored)
+        results = []
+        for exact, coverage, _, negative_id in best:
+            item = dict(self.summaries[-negative_id])
+            item["match_score"] = round(1.0 if exact else coverage, 3)
+            results.append(item)
+
+        return {"results": results, "total_matches": len(scored)}
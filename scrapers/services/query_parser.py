@@ -0,0 +1,169 @@
+# backend/services/query_parser.py
+import re
+from typing import Any, List, Optional, Tuple
+
+# field: prefix in a query -> searched column
+FIELD_ALIASES = {
+    "product": "product_name",
+    "reviewer": "reviewer",
+    "category": "category",
+    "text": "review_text",
+}
+OPERATORS = ("AND", "OR", "NOT")
+
+_FIELD_RE = re.compile(r"(\w+):(?=\S)")
+_WORD_RE = re.compile(r'[^\s()"]+')
+_STRUCTURED_RE = re.compile(
+    r'"|(?<!\S)(?:AND|OR|NOT)(?!\S)|(?<!\w)(?:' + "|".join(FIELD_ALIASES) + r"):",
+    re.IGNORECASE
+)
+
+# Query tree nodes (plain tuples):
+#   ("term", column, token)      ("phrase", column, [tokens])
+#   ("and", [nodes])   ("or", [nodes])   ("not", node)
+# column is None when the term is not scoped to a field.
+Node = Tuple[Any, ...]
+
+
+def is_structured(query: str) -> bool:
+    """Whether the query uses phrases, operators or field scoping"""
+    for match in _STRUCTURED_RE.finditer(query):
+        # Operators only count in upper case ("not bad" is plain text)
+        word = match.group(0)
+        if word.upper() not in OPERATORS or word in OPERATORS:
+            return True
+    return False
+
+
+def _lex(query: str) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    tokens = []
+    i, n = 0, len(query)
+    while i < n:
+        ch = query[i]
+        if ch.isspace():
+            i += 1
+            continue
+        if ch in "()":
+            tokens.append((ch, None, None))
+            i += 1
+            continue
+
+        column = None
+        match = _FIELD_RE.match(query, i)
+        if match and match.group(1).lower() in FIELD_ALIASES:
+            column = FIELD_ALIASES[match.group(1).lower()]
+            i = match.end()
+
+        if i < n and query[i] == '"':
+            # An unterminated quote runs to the end of the query
+            end = query.find('"', i + 1)
+            end = n if end == -1 else end
+            tokens.append(("text", column, query[i + 1:end]))
+            i = end + 1
+            continue
+
+        match = _WORD_RE.match(query, i)
+        if match is None:
+            i += 1
+            continue
+        word = match.group(0)
+        i = match.end()
+        if column is None and word in OPERATORS:
+            tokens.append((word, None, None))
+        else:
+            tokens.append(("text", column, word))
+    return tokens
+
+
+class _Parser:
+    """Recursive descent: OR binds loosest, then (implicit) AND, then NOT"""
+
+    def __init__(self, tokens, tokenize):
+        self.tokens = tokens
+        self.pos = 0
+        self.tokenize = tokenize
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def parse(self) -> Optional[Node]:
+        nodes = []
+        while self.pos < len(self.tokens):
+            node = self.parse_or()
+            if node is not None:
+                nodes.append(node)
+            if self.peek() == ")":
+                # Stray closing parenthesis
+                self.pos += 1
+        return _combine("and", nodes)
+
+    def parse_or(self) -> Optional[Node]:
+        nodes = [self.parse_and()]
+        while self.peek() == "OR":
+            self.pos += 1
+            nodes.append(self.parse_and())
+        return _combine("or", [node for node in nodes if node is not None])
+
+    def parse_and(self) -> Optional[Node]:
+        nodes = []
+        while self.peek() not in (None, ")", "OR"):
+            if self.peek() == "AND":
+                self.pos += 1
+                continue
+            node = self.parse_unary()
+            if node is not None:
+                nodes.append(node)
+        return _combine("and", nodes)
+
+    def parse_unary(self) -> Optional[Node]:
+        if self.peek() == "NOT":
+            self.pos += 1
+            if self.peek() in (None, ")", "OR"):
+                return None
+            node = self.parse_unary()
+            return None if node is None else ("not", node)
+        return self.parse_primary()
+
+    def parse_primary(self) -> Optional[Node]:
+        kind, column, text = self.tokens[self.pos]
+        self.pos += 1
+        if kind == "(":
+            node = self.parse_or()
+            if self.peek() == ")":
+                self.pos += 1
+            return node
+
+        words = self.tokenize(text)
+        if not words:
+            return None
+        if len(words) == 1:
+            return ("term", column, words[0])
+        # Quoted text, or a word that tokenizes into several ("wi-fi")
+        return ("phrase", column, words)
+
+
+def _combine(kind: str, nodes: List[Node]) -> Optional[Node]:
+    if not nodes:
+        return None
+    if len(nodes) == 1:
+        return nodes[0]
+    return (kind, nodes)
+
+
+def parse_query(query: str, tokenize) -> Optional[Node]:
+    """Parse a structured query into a node tree (None when nothing is searchable)"""
+    return _Parser(_lex(query), tokenize).parse()
+
+
+def positive_terms(node: Optional[Node]) -> List[str]:
+    """Tokens the query asks for (not under NOT), used for ranking"""
+    if node is None:
+        return []
+    kind = node[0]
+    if kind == "term":
+        return [node[2]]
+    if kind == "phrase":
+        return list(node[2])
+    if kind == "not":
+        return []
+    return [token for child in node[1] for token in positive_terms(child)]
@@ -0,0 +1,155 @@
+# backend/services/rating_trends.py
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.aggregate_cube import Totals
+from services.dataset_provider import DATASET_PATH, get_provider
+from services.review_dates import normalize_review_dates
+
+# Query value -> pandas period frequency
+GRANULARITIES = {"week": "W", "month": "M", "quarter": "Q"}
+
+# Slopes smaller than this (stars per period) count as a stable trend
+TREND_EPSILON = 0.05
+
+DailyTotals = Dict[pd.Timestamp, Totals]
+
+
+def trend_slope(points: List[Tuple[int, float, int]]) -> Optional[float]:
+    """Least-squares slope of (period ordinal, avg rating, reviews) points, weighted by reviews.
+
+    Using the ordinal keeps gaps between periods in the x axis. None with
+    fewer than two periods.
+    """
+    if len(points) < 2:
+        return None
+    x = np.array([point[0] for point in points], dtype=np.float64)
+    y = np.array([point[1] for point in points], dtype=np.float64)
+    weights = np.array([point[2] for point in points], dtype=np.float64)
+
+    x_mean = np.average(x, weights=weights)
+    y_mean = np.average(y, weights=weights)
+    spread = np.sum(weights * (x - x_mean) ** 2)
+    if spread == 0:
+        return None
+    return float(np.sum(weights * (x - x_mean) * (y - y_mean)) / spread)
+
+
+def trend_label(slope: Optional[float]) -> str:
+    if slope is None or abs(slope) < TREND_EPSILON:
+        return "stable"
+    return "improving" if slope > 0 else "declining"
+
+
+class RatingRollups:
+    """Per-day review counts and rating sums: overall, per category and per product.
+
+    Review dates are normalized once when the rollups are built; a trend at
+    any granularity merges day buckets, so its cost depends on the number of
+    distinct days, not on the number of reviews.
+    """
+
+    def __init__(self):
+        self.overall: DailyTotals = {}
+        self.by_category: Dict[Any, DailyTotals] = {}
+        self.by_product: Dict[Any, DailyTotals] = {}
+        self.undated = 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "RatingRollups":
+        rollups = cls()
+        rollups.build(df)
+        return rollups
+
+    def build(self, df: pd.DataFrame):
+        self.overall, self.by_category, self.by_product = {}, {}, {}
+        self.undated = 0
+        if df.empty or "date" not in df.columns:
+            self.undated = len(df)
+            return
+
+        days = normalize_review_dates(df["date"], df["scraped_date"] if "scraped_date" in df.columns else None)
+        self.undated = int(days.isna().sum())
+
+        missing = pd.Series(None, index=df.index, dtype=object)
+        verified = df["verified_norm"] == "yes" if "verified_norm" in df.columns else pd.Series(False, index=df.index)
+        frame = pd.DataFrame({
+            "day": days,
+            "category": df["category"] if "category" in df.columns else missing,
+            "product_name": df["product_name"] if "product_name" in df.columns else missing,
+            "rating": pd.to_numeric(df["rating"], errors="coerce") if "rating" in df.columns else np.nan,
+            "verified": verified,
+        }).dropna(subset=["day"])
+
+        grouped = frame.groupby(["day", "category", "product_name"], sort=False, dropna=False).agg(
+            reviews=("verified", "size"),
+            rated=("rating", "count"),
+            rating_sum=("rating", "sum"),
+            verified=("verified", "sum"),
+        )
+        for (day, category, product), row in zip(grouped.index, grouped.itertuples(index=False)):
+            totals = Totals(int(row.reviews), int(row.rated), float(row.rating_sum), int(row.verified))
+            self._merge(day, None if pd.isna(category) else category, None if pd.isna(product) else product, totals)
+
+    def _merge(self, day: pd.Timestamp, category: Any, product: Any, totals: Totals):
+        for buckets in (
+            self.overall,
+            self.by_category.setdefault(category, {}),
+            self.by_product.setdefault(product, {}),
+        ):
+            bucket = buckets.get(day)
+            if bucket is None:
+                bucket = buckets[day] = Totals()
+            bucket.merge(totals)
+
+    def periods(
+        self,
+        granularity: str = "month",
+        category: Optional[str] = None,
+        product: Optional[str] = None
+    ) -> List[Tuple[pd.Period, Totals]]:
+        """Day buckets merged into periods (oldest first), optionally for one category or product"""
+        freq = GRANULARITIES[granularity]
+        if product is not None:
+            days = self.by_product.get(product, {})
+        elif category is not None:
+            days = self.by_category.get(category, {})
+        else:
+            days = self.overall
+
+        merged: Dict[pd.Period, Totals] = {}
+        for day, totals in list(days.items()):
+            period = day.to_period(freq)
+            bucket = merged.get(period)
+            if bucket is None:
+                bucket = merged[period] = Totals()
+            bucket.merge(totals)
+        return sorted(merged.items())
+
+    def trend(
+        self,
+        granularity: str = "month",
+        category: Optional[str] = None,
+        product: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Per-period averages and counts with a fitted slope (stars per period)"""
+        periods = self.periods(granularity, category, product)
+        rated = [(period, totals) for period, totals in periods if totals.rated]
+        slope = trend_slope([(period.ordinal, totals.avg_rating, totals.rated) for period, totals in rated])
+
+        return {
+            "granularity": granularity,
+            "period_avg": {str(period): round(totals.avg_rating, 4) for period, totals in rated},
+            "period_counts": {str(period): totals.reviews for period, totals in periods},
+            "slope_per_period": round(slope, 4) if slope is not None else None,
+            "overall_trend": trend_label(slope),
+            "dated_reviews": sum(totals.reviews for _, totals in periods),
+            "undated_reviews": self.undated if category is None and product is None else None
+        }
+
+
+def dataset_rollups(path: str = DATASET_PATH) -> RatingRollups:
+    """The rollups for a dataset file, rebuilt only when the file changes"""
+    return get_provider(path).derived("rating_rollups", RatingRollups.from_frame)
@@ -0,0 +1,116 @@
+# backend/services/recency_index.py
+import bisect
+import heapq
+import threading
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.dataset_provider import DATASET_PATH, get_provider
+from services.review_dates import to_timestamps
+from services.text_normalize import norm_column, normalize_text
+
+# Columns with their own recency lists (looked up by normalized value)
+RECENCY_KEYS = ("product_name", "category")
+
+# Sort key for rows without a parseable timestamp: older than everything
+MISSING_STAMP = np.iinfo(np.int64).min
+
+
+def _stamp(value: Any) -> int:
+    stamp = pd.Timestamp(value) if value is not None and not pd.isna(value) else pd.NaT
+    return MISSING_STAMP if pd.isna(stamp) else int(stamp.value)
+
+
+class RecencyIndex:
+    """Row positions ordered by scraped_date (newest first), overall and per product / category.
+
+    The order is computed once with a single sort; rows added afterwards are
+    kept in small sorted side lists (appends are usually already newest, so
+    inserting is O(1) amortized). Reading the k most recent rows merges the two
+    heads and costs O(k). Ties on the timestamp put the later row first.
+    """
+
+    def __init__(self):
+        self.order = np.empty(0, dtype=np.int64)
+        self.by_key: Dict[str, Dict[str, np.ndarray]] = {column: {} for column in RECENCY_KEYS}
+        self._stamps = np.empty(0, dtype=np.int64)
+        # Rows added since the build: (stamp, position), oldest first
+        self._added: List[Tuple[int, int]] = []
+        self._added_by_key: Dict[str, Dict[str, List[Tuple[int, int]]]] = {column: {} for column in RECENCY_KEYS}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str = "scraped_date") -> "RecencyIndex":
+        index = cls()
+        index.build(df, column)
+        return index
+
+    def build(self, df: pd.DataFrame, column: str = "scraped_date"):
+        self._added = []
+        self._added_by_key = {key: {} for key in RECENCY_KEYS}
+
+        if column in df.columns:
+            stamps = to_timestamps(df[column])
+            values = stamps.to_numpy(dtype="datetime64[ns]").view(np.int64)
+            self._stamps = np.where(stamps.isna().to_numpy(), MISSING_STAMP, values)
+        else:
+            self._stamps = np.full(len(df), MISSING_STAMP, dtype=np.int64)
+        positions = np.arange(len(df), dtype=np.int64)
+        # Ascending by (stamp, position), reversed: newest first, later rows first on ties
+        self.order = np.lexsort((positions, self._stamps))[::-1].copy()
+
+        self.by_key = {}
+        for key in RECENCY_KEYS:
+            source = norm_column(key) if norm_column(key) in df.columns else key
+            if source not in df.columns:
+                self.by_key[key] = {}
+                continue
+            values = df[source].to_numpy()[self.order]
+            groups = pd.Series(values, dtype=object).groupby(values, sort=False).indices
+            self.by_key[key] = {value: self.order[members] for value, members in groups.items()}
+
+    def add(self, position: int, row: Dict[str, Any], timestamp: Any = None):
+        """Record one appended row (timestamp defaults to its scraped_date)"""
+        entry = (_stamp(row.get("scraped_date") if timestamp is None else timestamp), position)
+        with self._lock:
+            self._insert(self._added, entry)
+            for key in RECENCY_KEYS:
+                value = row.get(norm_column(key))
+                if value is None:
+                    value = normalize_text(row.get(key))
+                self._insert(self._added_by_key[key].setdefault(value, []), entry)
+
+    @staticmethod
+    def _insert(entries: List[Tuple[int, int]], entry: Tuple[int, int]):
+        if not entries or entries[-1] <= entry:
+            entries.append(entry)
+        else:
+            bisect.insort(entries, entry)
+
+    def recent(self, limit: int, key: Optional[str] = None, value: Optional[str] = None) -> List[int]:
+        """Positions of the `limit` most recent rows, optionally where column `key` equals `value`"""
+        if key is None:
+            built, added = self.order, self._added
+        else:
+            normalized = normalize_text(value)
+            built = self.by_key.get(key, {}).get(normalized, self.order[:0])
+            added = self._added_by_key.get(key, {}).get(normalized, [])
+
+        if not added:
+            return built[:limit].tolist()
+
+        stamps = self._stamps
+        heads: Iterator[Tuple[int, int]] = heapq.merge(
+            ((int(stamps[position]), int(position)) for position in built[:limit]),
+            reversed(added[-limit:]),
+            reverse=True
+        )
+        return [position for _, position in islice(heads, limit)]
+
+
+def dataset_recency(path: str = DATASET_PATH) -> RecencyIndex:
+    """The recency index for a dataset file, rebuilt only when the file changes"""
+    return get_provider(path).derived("recency_index", RecencyIndex.from_frame)
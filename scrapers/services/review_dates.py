@@ -0,0 +1,110 @@
+# backend/services/review_dates.py
+import re
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+MONTHS = {
+    name: number for number, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1
+    )
+}
+
+# "Oct, 2024" / "October 2024" (Flipkart shows older reviews by month)
+MONTH_YEAR_RE = re.compile(r"^([a-z]{3,9})\.?,?\s+(\d{4})$")
+# "6 days ago" / "a month ago" (recent reviews, relative to when they were scraped)
+RELATIVE_RE = re.compile(r"^(\d+|an?|one)\s+(second|minute|hour|day|week|month|year)s?\s+ago$")
+ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+# Relative dates are kept as (unit, amount) until the scrape time is known
+ParsedDate = Union[pd.Timestamp, Tuple[str, int], None]
+
+
+def parse_review_date(value: Any) -> ParsedDate:
+    """Review day for one raw `date` value, an (unit, amount) offset, or None for free text"""
+    if value is None:
+        return None
+    if isinstance(value, (datetime, date, np.datetime64)):
+        stamp = pd.Timestamp(value)
+        return None if pd.isna(stamp) else stamp.normalize()
+    if not isinstance(value, str) and pd.isna(value):
+        return None
+
+    text = " ".join(str(value).lower().split())
+
+    match = MONTH_YEAR_RE.match(text)
+    if match:
+        month = MONTHS.get(match.group(1)[:3])
+        return pd.Timestamp(int(match.group(2)), month, 1) if month else None
+
+    if text in ("today", "just now"):
+        return ("days", 0)
+    if text == "yesterday":
+        return ("days", 1)
+
+    match = RELATIVE_RE.match(text)
+    if match:
+        amount = int(match.group(1)) if match.group(1).isdigit() else 1
+        unit = match.group(2)
+        if unit in ("second", "minute", "hour"):
+            return ("days", 0)
+        return (unit + "s", amount)
+
+    if ISO_DATE_RE.match(text):
+        stamp = pd.to_datetime(text, errors="coerce")
+        return None if pd.isna(stamp) else stamp.normalize()
+
+    return None
+
+
+def to_timestamps(values: pd.Series) -> pd.Series:
+    """Timestamps for a column of date-time strings (each distinct value parsed once); NaT when unparseable"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), errors="coerce", format="mixed")
+    stamps = np.append(parsed.to_numpy(dtype="datetime64[ns]"), np.datetime64("NaT"))
+    return pd.Series(stamps[codes], index=values.index)
+
+
+def to_days(values: pd.Series) -> pd.Series:
+    """to_timestamps floored to the day"""
+    return to_timestamps(values).dt.normalize()
+
+
+def normalize_review_dates(dates: pd.Series, scraped: Optional[pd.Series] = None) -> pd.Series:
+    """Review day per row (datetime64, midnight), NaT where `date` holds no date.
+
+    Each distinct value is parsed once. Relative values ("3 days ago") are
+    resolved against the row's scraped_date and stay NaT without one.
+    """
+    codes, uniques = pd.factorize(dates)
+    parsed = [parse_review_date(value) for value in uniques]
+
+    absolute = [value if isinstance(value, pd.Timestamp) else pd.NaT for value in parsed]
+    days = np.append(pd.to_datetime(pd.Series(absolute, dtype="datetime64[ns]")).to_numpy(), np.datetime64("NaT"))
+    result = pd.Series(days[codes], index=dates.index)
+
+    offsets: Dict[Tuple[str, int], List[int]] = {}
+    for code, value in enumerate(parsed):
+        if isinstance(value, tuple):
+            offsets.setdefault(value, []).append(code)
+
+    if offsets and scraped is not None:
+        reference = to_days(scraped)
+        for (unit, amount), group in offsets.items():
+            mask = np.isin(codes, group)
+            result[mask] = reference[mask] - pd.DateOffset(**{unit: amount})
+
+    return result
+
+
+def normalize_review_date(value: Any, scraped: Any = None) -> Optional[pd.Timestamp]:
+    """Single-value normalize_review_dates, for rows appended one at a time"""
+    parsed = parse_review_date(value)
+    if isinstance(parsed, tuple):
+        reference = to_days(pd.Series([scraped], dtype=object)).iloc[0]
+        return None if pd.isna(reference) else reference - pd.DateOffset(**{parsed[0]: parsed[1]})
+    return parsed
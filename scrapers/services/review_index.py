@@ -0,0 +1,175 @@
+# backend/services/review_index.py
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def intersect_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Intersect two sorted row-id arrays by probing the smaller into the larger"""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) == 0:
+        return a
+    idx = np.searchsorted(b, a)
+    idx[idx == len(b)] = len(b) - 1
+    return a[b[idx] == a]
+
+
+def union_sorted(arrays: List[np.ndarray]) -> np.ndarray:
+    """Union of disjoint sorted row-id arrays (one per index key)"""
+    if not arrays:
+        return np.empty(0, dtype=np.int64)
+    if len(arrays) == 1:
+        return arrays[0]
+    return np.sort(np.concatenate(arrays), kind="mergesort")
+
+
+def extend_buffered(buffers: Dict[Any, np.ndarray], key: Any, current: np.ndarray, values: Any) -> np.ndarray:
+    """`current` with `values` appended, written into spare room of a capacity-doubling buffer.
+
+    `buffers[key]` is the buffer `current` is a prefix view of; it is only
+    reallocated when full, so repeated appends cost amortized O(len(values)).
+    Views handed out earlier never see the new values.
+    """
+    values = np.asarray(values, dtype=current.dtype).reshape(-1)
+    size = len(current)
+    needed = size + len(values)
+    buffer = buffers.get(key)
+    if buffer is None or len(buffer) < needed:
+        buffer = np.empty(max(2 * needed, 8), dtype=current.dtype)
+        buffer[:size] = current
+        buffers[key] = buffer
+    buffer[size:needed] = values
+    return buffer[:needed]
+
+
+class ReviewIndex:
+    """Posting-list indexes (sorted row positions) for the review filters"""
+
+    # filter name -> DataFrame column
+    FIELDS = {
+        "category": "category",
+        "product": "product_name",
+        "rating": "rating",
+        "verified": "verified",
+    }
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[Any, np.ndarray]] = {}
+        self.id_positions: Dict[int, int] = {}
+        # Largest review_id, so assigning the next one never scans the ids
+        self.max_id = 0
+        self.size = 0
+        # Growth buffers behind posting lists that rows were appended to
+        self._buffers: Dict[Tuple[str, Any], np.ndarray] = {}
+
+    # -------------------------------------------------------------
+    # Build / patch
+    # -------------------------------------------------------------
+    def build(self, df: pd.DataFrame):
+        """Build posting lists for every indexed column present in the frame"""
+        self.postings = {}
+        self.id_positions = {}
+        self.max_id = 0
+        self._buffers = {}
+        self.size = 0 if df is None else len(df)
+
+        if df is None or df.empty:
+            return
+
+        if "review_id" in df.columns:
+            # First occurrence wins, matching the old boolean-scan lookup
+            for position, review_id in enumerate(df["review_id"].tolist()):
+                if review_id is not None and not pd.isna(review_id):
+                    self.id_positions.setdefault(int(review_id), position)
+            if self.id_positions:
+                self.max_id = max(self.id_positions)
+
+        for field, column in self.FIELDS.items():
+            if column not in df.columns:
+                continue
+            # groupby().indices gives ascending row positions per key
+            groups = df.groupby(column, sort=False).indices
+            self.postings[field] = {
+                key: np.asarray(rows, dtype=np.int64) for key, rows in groups.items()
+            }
+
+    def add_row(self, position: int, row: Dict[str, Any]):
+        """Patch the posting lists for a row appended at `position`"""
+        review_id = row.get("review_id")
+        if review_id is not None and not pd.isna(review_id):
+            self.id_positions.setdefault(int(review_id), position)
+            self.max_id = max(self.max_id, int(review_id))
+
+        for field, column in self.FIELDS.items():
+            value = row.get(column)
+            if value is None or (not isinstance(value, str) and pd.isna(value)):
+                continue
+            keys = self.postings.setdefault(field, {})
+            current = keys.get(value)
+            if current is None:
+                keys[value] = np.array([position], dtype=np.int64)
+            else:
+                keys[value] = extend_buffered(self._buffers, (field, value), current, position)
+        self.size = max(self.size, position + 1)
+
+    # -------------------------------------------------------------
+    # Lookups
+    # -------------------------------------------------------------
+    def position_of(self, review_id: int) -> Optional[int]:
+        """Row position of a review_id (constant time)"""
+        return self.id_positions.get(int(review_id))
+
+    def positions_of(self, review_ids: Iterable[int]) -> List[int]:
+        """Row positions for many review_ids, in request order, skipping unknown ids"""
+        lookup = self.id_positions.get
+        positions = (lookup(int(review_id)) for review_id in review_ids)
+        return [position for position in positions if position is not None]
+
+    def _keys_matching(self, field: str, pattern: str) -> Iterable[Any]:
+        """Keys of a text index matching `pattern` case-insensitively"""
+        try:
+            regex = re.compile(pattern, re.IGNORECASE)
+        except re.error:
+            regex = re.compile(re.escape(pattern), re.IGNORECASE)
+        return [key for key in self.postings.get(field, {}) if regex.search(str(key))]
+
+    def _rows_for_keys(self, field: str, keys: Iterable[Any]) -> np.ndarray:
+        index = self.postings.get(field, {})
+        return union_sorted([index[key] for key in keys if key in index])
+
+    def select(self, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Sorted row positions matching all filters (None when nothing is filtered)"""
+        candidates: List[np.ndarray] = []
+
+        if filters.get("category"):
+            keys = self._keys_matching("category", filters["category"])
+            candidates.append(self._rows_for_keys("category", keys))
+
+        if filters.get("product"):
+            keys = self._keys_matching("product", filters["product"])
+            candidates.append(self._rows_for_keys("product", keys))
+
+        if filters.get("min_rating") or filters.get("max_rating"):
+            low = filters.get("min_rating") or -np.inf
+            high = filters.get("max_rating") or np.inf
+            keys = [key for key in self.postings.get("rating", {}) if low <= key <= high]
+            candidates.append(self._rows_for_keys("rating", keys))
+
+        if "verified" in filters:
+            wanted = "yes" if filters["verified"] else "no"
+            candidates.append(self._rows_for_keys("verified", [wanted]))
+
+        if not candidates:
+            return None
+
+        # Start from the shortest list so every step costs O(matches)
+        candidates.sort(key=len)
+        result = candidates[0]
+        for rows in candidates[1:]:
+            if len(result) == 0:
+                break
+            result = intersect_sorted(result, rows)
+        return result
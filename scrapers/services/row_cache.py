@@ -0,0 +1,94 @@
+# backend/services/row_cache.py
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# Field order of the Review model in app.py; /search returns the first six
+REVIEW_FIELDS = [
+    "review_id", "category", "product_name", "rating",
+    "review_text", "reviewer", "date", "verified"
+]
+SEARCH_FIELDS = REVIEW_FIELDS[:6]
+
+# Same settings FastAPI's JSONResponse uses, so both paths emit identical bytes
+_JSON_OPTIONS = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+def dumps(value: Any) -> bytes:
+    return json.dumps(value, **_JSON_OPTIONS).encode("utf-8")
+
+
+def canonical_review(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Typed, API-shaped values for one review record"""
+    date = item.get("date")
+    return {
+        "review_id": int(item.get("review_id", 0)),
+        "category": str(item.get("category", "Unknown")),
+        "product_name": str(item.get("product_name", "Unknown")),
+        "rating": int(item.get("rating", 0)),
+        "review_text": str(item.get("review_text", "")),
+        "reviewer": str(item.get("reviewer", "Customer")),
+        "date": None if date is None or pd.isna(date) or date == "" else str(date),
+        "verified": str(item.get("verified", "No")),
+    }
+
+
+class RowJsonCache:
+    """Canonical JSON bytes for every review row, encoded once per load"""
+
+    def __init__(self):
+        self.rows: List[Optional[bytes]] = []
+        # byte offset where `,"date":` starts, i.e. the end of the search projection
+        self.search_cuts: List[int] = []
+        # False where the Review model would reject the row (rating outside 1-5)
+        self.valid: List[bool] = []
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _encode(self, item: Dict[str, Any]):
+        try:
+            review = canonical_review(item)
+        except (TypeError, ValueError):
+            return None, 0, False
+        head = dumps({field: review[field] for field in SEARCH_FIELDS})
+        tail = dumps({"date": review["date"], "verified": review["verified"]})
+        return head[:-1] + b"," + tail[1:], len(head) - 1, 1 <= review["rating"] <= 5
+
+    def build(self, df: pd.DataFrame):
+        self.rows = []
+        self.search_cuts = []
+        self.valid = []
+        if df is None or df.empty:
+            return
+
+        columns = [column for column in REVIEW_FIELDS if column in df.columns]
+        for values in df[columns].itertuples(index=False, name=None):
+            self.append(dict(zip(columns, values)))
+
+    def append(self, item: Dict[str, Any]):
+        row, cut, valid = self._encode(item)
+        self.rows.append(row)
+        self.search_cuts.append(cut)
+        self.valid.append(valid)
+
+    # -------------------------------------------------------------
+    # Response assembly
+    # -------------------------------------------------------------
+    def review_array(self, positions: Iterable[int]) -> bytes:
+        """JSON array of full Review objects for the given row positions"""
+        rows, valid = self.rows, self.valid
+        # The slow path drops rows the Review model rejects, so skip them too
+        fragments = [rows[position] for position in positions if valid[position]]
+        return b"[" + b",".join(fragments) + b"]"
+
+    def search_array(self, positions: Iterable[int]) -> List[bytes]:
+        """Search-projection fragments (no date/verified) for the given row positions"""
+        rows, cuts = self.rows, self.search_cuts
+        fragments = []
+        for position in positions:
+            row = rows[position]
+            if row is not None:
+                fragments.append(row[:cuts[position]] + b"}")
+        return fragments
@@ -0,0 +1,505 @@
+# backend/services/search_index.py
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.query_parser import Node, is_structured, parse_query, positive_terms
+from services.review_index import extend_buffered, intersect_sorted
+from services.text_normalize import norm_column, normalize_series, normalize_text
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Columns searched by /search
+TEXT_FIELDS = ["review_text", "product_name", "category", "reviewer"]
+
+# BM25F field weights for rank=bm25 (a product-name hit counts most)
+FIELD_WEIGHTS = {
+    "review_text": 1.0,
+    "product_name": 3.0,
+    "category": 1.5,
+    "reviewer": 0.5,
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Each occurrence packs (field, word index, char offset) into one int64:
+# field << 42 | word << 21 | char. word << 21 | field above it is the phrase key.
+POSITION_BITS = 21
+MAX_POSITION = (1 << POSITION_BITS) - 1
+FIELD_SHIFT = 2 * POSITION_BITS
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+# Occurrences tokenized before the build packs them into arrays
+BUILD_CHUNK = 1 << 18
+
+# Query words at least this long find the tokens containing them through
+# the trigram map; shorter ones scan the vocabulary
+TRIGRAM = 3
+
+
+def token_spans(text: Any) -> List[Tuple[str, int]]:
+    """(normalized token, char offset in the raw text) for every word of a field value"""
+    if text is None or (not isinstance(text, str) and pd.isna(text)):
+        return []
+    return [
+        (unicodedata.normalize("NFKC", match.group(0)).casefold(), match.start())
+        for match in TOKEN_RE.finditer(str(text))
+    ]
+
+
+def pack_occurrence(field: int, word: int, start: int) -> int:
+    return (field << FIELD_SHIFT) | (min(word, MAX_POSITION) << POSITION_BITS) | min(start, MAX_POSITION)
+
+
+def tokenize(text: Any) -> List[str]:
+    """Lowercase word tokens of a field value"""
+    return [token for token, _ in token_spans(text)]
+
+
+def token_trigrams(token: str) -> Set[str]:
+    """Distinct three-character substrings of a token"""
+    return {token[i:i + TRIGRAM] for i in range(len(token) - TRIGRAM + 1)}
+
+
+class SearchIndex:
+    """Token -> sorted row positions over the searchable text columns.
+
+    Alongside each posting list, `occurrences[token]` holds every packed
+    (field, word, char) occurrence of the token, row by row, with
+    `occurrence_offsets[token]` marking where each posting's run starts.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, np.ndarray] = {}
+        self.occurrences: Dict[str, np.ndarray] = {}
+        self.occurrence_offsets: Dict[str, np.ndarray] = {}
+        # Per posting: field-weighted, length-normalized term frequency (BM25F)
+        self.term_weights: Dict[str, np.ndarray] = {}
+        # Running token totals per field, for average field lengths
+        self.field_totals = [0] * len(TEXT_FIELDS)
+        # Sorted distinct tokens, and trigram -> tokens containing it, for
+        # finding the tokens a plain query word occurs inside
+        self.vocabulary: List[str] = []
+        self._trigrams: Dict[str, List[str]] = {}
+        # Normalized field values per row (references to the frame's shadow columns)
+        self.documents: List[Tuple[Any, ...]] = []
+        # Growth buffers behind the per-token arrays that rows were appended to
+        self._buffers: Dict[Tuple[str, str], np.ndarray] = {}
+
+    def __len__(self):
+        return len(self.documents)
+
+    # -------------------------------------------------------------
+    # Build / patch
+    # -------------------------------------------------------------
+    def build(self, df: pd.DataFrame):
+        self.postings = {}
+        self.occurrences = {}
+        self.occurrence_offsets = {}
+        self.term_weights = {}
+        self.field_totals = [0] * len(TEXT_FIELDS)
+        self.vocabulary = []
+        self._trigrams = {}
+        self.documents = []
+        self._buffers = {}
+        if df is None or df.empty:
+            return
+
+        # Raw values are tokenized (char offsets point into them); substring
+        # checks read the normalized shadow columns
+        raw_columns, normalized_columns = [], []
+        for column in TEXT_FIELDS:
+            if column not in df.columns:
+                raw_columns.append([None] * len(df))
+                normalized_columns.append([""] * len(df))
+                continue
+            shadow = norm_column(column)
+            normalized = df[shadow] if shadow in df.columns else normalize_series(df[column])
+            raw_columns.append(df[column].tolist())
+            normalized_columns.append(normalized.tolist())
+        self.documents = list(zip(*normalized_columns))
+
+        # Tokenize into flat (token id, row, packed occurrence) arrays, packed a
+        # chunk at a time, so the build holds a few integers per occurrence
+        # instead of Python lists per row and per token
+        token_ids: Dict[str, int] = {}
+        lengths = np.zeros((len(df), len(TEXT_FIELDS)), dtype=np.int32)
+        chunks: Tuple[List[np.ndarray], ...] = ([], [], [])
+        ids: List[int] = []
+        rows: List[int] = []
+        packed: List[int] = []
+        for position, values in enumerate(zip(*raw_columns)):
+            for field, value in enumerate(values):
+                spans = token_spans(value)
+                lengths[position, field] = len(spans)
+                for word, (token, start) in enumerate(spans):
+                    ids.append(token_ids.setdefault(token, len(token_ids)))
+                    rows.append(position)
+                    packed.append(pack_occurrence(field, word, start))
+            if len(packed) >= BUILD_CHUNK or position == len(df) - 1:
+                chunks[0].append(np.array(ids, dtype=np.int32))
+                chunks[1].append(np.array(rows, dtype=np.int32))
+                chunks[2].append(np.array(packed, dtype=np.int64))
+                ids, rows, packed = [], [], []
+        self.field_totals = lengths.sum(axis=0).tolist()
+
+        # Group occurrences by token; a stable sort keeps them in row, field, word order.
+        # Arrays are joined and reordered one at a time to keep a single extra copy alive.
+        token_of = self._join(chunks[0])
+        order = np.argsort(token_of, kind="stable")
+        token_of = token_of[order]
+        row_of = self._join(chunks[1])[order]
+        codes = self._join(chunks[2])[order]
+        del order
+
+        # One posting per (token, row) run of occurrences
+        is_start = np.ones(len(codes), dtype=bool)
+        is_start[1:] = (token_of[1:] != token_of[:-1]) | (row_of[1:] != row_of[:-1])
+        starts = np.flatnonzero(is_start)
+        posting_rows = row_of[starts].astype(np.int64)
+        posting_tokens = token_of[starts]
+        occurrence_bounds = np.append(starts, len(codes))
+        del token_of, row_of, is_start, starts
+
+        # BM25F weights against the final average field lengths, a chunk of postings at a time
+        documents = max(len(self.documents), 1)
+        averages = [total / documents or 1.0 for total in self.field_totals]
+        weights = np.empty(len(posting_rows), dtype=np.float32)
+        for begin in range(0, len(posting_rows), BUILD_CHUNK):
+            end = min(begin + BUILD_CHUNK, len(posting_rows))
+            bounds = occurrence_bounds[begin:end + 1]
+            posting_of = np.repeat(np.arange(end - begin), np.diff(bounds))
+            field_of = codes[bounds[0]:bounds[-1]] >> FIELD_SHIFT
+            chunk = np.zeros(end - begin, dtype=np.float64)
+            for field, column in enumerate(TEXT_FIELDS):
+                tf = np.bincount(posting_of[field_of == field], minlength=end - begin)
+                present = np.flatnonzero(tf)
+                norm = 1 - BM25_B + BM25_B * lengths[posting_rows[begin + present], field] / averages[field]
+                chunk[present] += FIELD_WEIGHTS[column] * tf[present] / norm
+            weights[begin:end] = chunk
+        del lengths
+
+        # Per-token arrays are slices of the shared ones
+        token_bounds = np.flatnonzero(np.r_[True, posting_tokens[1:] != posting_tokens[:-1]]).tolist()
+        token_bounds.append(len(posting_rows))
+        for token, begin, end in zip(token_ids, token_bounds, token_bounds[1:]):
+            first = occurrence_bounds[begin]
+            self.postings[token] = posting_rows[begin:end]
+            self.term_weights[token] = weights[begin:end]
+            self.occurrences[token] = codes[first:occurrence_bounds[end]]
+            self.occurrence_offsets[token] = occurrence_bounds[begin:end + 1] - first
+        self.vocabulary = sorted(self.postings)
+        for token in self.vocabulary:
+            self._add_trigrams(token)
+
+    def add_row(self, position: int, row: Dict[str, Any]):
+        """Index a row appended at `position` (positions only ever grow)"""
+        self.documents.append(tuple(
+            row[norm_column(column)] if norm_column(column) in row else normalize_text(row.get(column))
+            for column in TEXT_FIELDS
+        ))
+        field_spans = [token_spans(row.get(column)) for column in TEXT_FIELDS]
+        for field, spans in enumerate(field_spans):
+            self.field_totals[field] += len(spans)
+
+        row_codes = self._occurrence_codes(field_spans)
+        for token, weight in self._weighted_tfs(field_spans).items():
+            token_codes = np.asarray(row_codes[token], dtype=np.int64)
+            current = self.postings.get(token)
+            if current is None:
+                self.postings[token] = np.array([position], dtype=np.int64)
+                self.occurrences[token] = token_codes
+                self.occurrence_offsets[token] = np.array([0, len(token_codes)], dtype=np.int64)
+                self.term_weights[token] = np.array([weight], dtype=np.float32)
+                bisect.insort(self.vocabulary, token)
+                self._add_trigrams(token)
+            else:
+                # Appended in place into spare buffer room: amortized O(1) per token
+                buffers = self._buffers
+                self.postings[token] = extend_buffered(buffers, ("postings", token), current, position)
+                self.occurrences[token] = extend_buffered(
+                    buffers, ("occurrences", token), self.occurrences[token], token_codes
+                )
+                offsets = self.occurrence_offsets[token]
+                self.occurrence_offsets[token] = extend_buffered(
+                    buffers, ("offsets", token), offsets, offsets[-1] + len(token_codes)
+                )
+                self.term_weights[token] = extend_buffered(
+                    buffers, ("weights", token), self.term_weights[token], weight
+                )
+
+    @staticmethod
+    def _join(parts: List[np.ndarray]) -> np.ndarray:
+        """Concatenate chunk arrays, releasing the chunks"""
+        joined = np.concatenate(parts)
+        parts.clear()
+        return joined
+
+    def _add_trigrams(self, token: str):
+        for gram in token_trigrams(token):
+            self._trigrams.setdefault(gram, []).append(token)
+
+    @staticmethod
+    def _occurrence_codes(field_spans: List[List[Tuple[str, int]]]) -> Dict[str, List[int]]:
+        """Packed (field, word, char) occurrences of every token in one row"""
+        codes: Dict[str, List[int]] = {}
+        for field, spans in enumerate(field_spans):
+            for word, (token, start) in enumerate(spans):
+                codes.setdefault(token, []).append(pack_occurrence(field, word, start))
+        return codes
+
+    def _weighted_tfs(self, field_spans: List[List[Tuple[str, int]]]) -> Dict[str, float]:
+        """BM25F pseudo term frequency of every token in one row"""
+        documents = max(len(self.documents), 1)
+        weighted: Dict[str, float] = {}
+        for field, spans in enumerate(field_spans):
+            if not spans:
+                continue
+            counts = Counter(token for token, _ in spans)
+            length = len(spans)
+            average = self.field_totals[field] / documents or 1.0
+            norm = 1 - BM25_B + BM25_B * length / average
+            field_weight = FIELD_WEIGHTS[TEXT_FIELDS[field]]
+            for token, tf in counts.items():
+                weighted[token] = weighted.get(token, 0.0) + field_weight * tf / norm
+        return weighted
+
+    # -------------------------------------------------------------
+    # Query
+    # -------------------------------------------------------------
+    def _containing(self, word: str) -> List[str]:
+        """Index tokens that contain `word` anywhere (short words scan the vocabulary)"""
+        if len(word) < TRIGRAM:
+            pool = self.vocabulary
+        else:
+            pool = min((self._trigrams.get(gram, ()) for gram in token_trigrams(word)), key=len)
+        return [token for token in pool if word in token]
+
+    def _rows_with_any(self, tokens: List[str]) -> np.ndarray:
+        """Sorted rows containing at least one of the tokens"""
+        if len(tokens) <= 1:
+            return self.postings[tokens[0]] if tokens else _EMPTY
+        # Several of the tokens can occur in the same row
+        seen = np.zeros(len(self.documents), dtype=bool)
+        for token in tokens:
+            seen[self.postings[token]] = True
+        return np.flatnonzero(seen).astype(np.int64)
+
+    def _word_tokens(self, words: List[str]) -> List[List[str]]:
+        """Index tokens each query word can be part of in a contiguous hit.
+
+        Inner words are whole tokens; the first and last word can sit anywhere
+        inside a token ("phone" is found in "iphone", "ear" in "earphones").
+        """
+        expanded = []
+        for i, word in enumerate(words):
+            if 0 < i < len(words) - 1:
+                expanded.append([word] if word in self.postings else [])
+            else:
+                expanded.append(self._containing(word))
+        return expanded
+
+    def candidates(self, query: str) -> Optional[np.ndarray]:
+        """Rows holding a token for every query word (a superset of the contiguous hits)"""
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+
+        lists = [self._rows_with_any(word_tokens) for word_tokens in self._word_tokens(tokens)]
+        lists.sort(key=len)
+        result = lists[0]
+        for rows in lists[1:]:
+            if len(result) == 0:
+                break
+            result = intersect_sorted(result, rows)
+        return result
+
+    def _matches(self, query: str, candidates: np.ndarray, limit: Optional[int] = None):
+        """Candidates where one field contains the query as a contiguous string"""
+        needle = normalize_text(query)
+        if [needle] == tokenize(needle):
+            # A single whole word: every candidate already contains it
+            return candidates if limit is None else candidates[:limit]
+
+        documents = self.documents
+        hits = []
+        for position in candidates:
+            if any(needle in value for value in documents[position]):
+                hits.append(position)
+                if limit is not None and len(hits) >= limit:
+                    break
+        return np.asarray(hits, dtype=np.int64)
+
+    def search(self, query: str, limit: int, rank: Optional[str] = None) -> Optional[np.ndarray]:
+        """Rows matching the query, at most `limit` of them.
+
+        Plain queries match rows where one field contains the query text, as a
+        substring: posting lists narrow the rows down to those with a token
+        containing every word and only those candidates are checked for the
+        contiguous string. Queries
+        with quoted phrases, AND/OR/NOT or field scoping (product:, reviewer:,
+        category:, text:) are evaluated entirely by posting-list merges.
+        Results are in frame order, or by BM25F score with rank="bm25".
+        Returns None when the query has no word characters.
+        """
+        if is_structured(query):
+            node = parse_query(query, tokenize)
+            if node is None:
+                return None
+            matches = self.evaluate(node)
+            if rank != "bm25":
+                return matches[:limit]
+            return self._top_bm25(set(positive_terms(node)), matches, limit)
+
+        candidates = self.candidates(query)
+        if candidates is None:
+            return None
+
+        if rank != "bm25":
+            return self._matches(query, candidates, limit)
+
+        matches = self._matches(query, candidates)
+        return self._top_bm25(self._query_terms(query), matches, limit)
+
+    def _query_terms(self, query: str) -> Set[str]:
+        """Index tokens a plain query hits (the tokens its words occur in)"""
+        return {token for word_tokens in self._word_tokens(tokenize(query)) for token in word_tokens}
+
+    def highlight_terms(self, query: str) -> Set[str]:
+        """Index tokens that make a row match the query (what snippets highlight)"""
+        if is_structured(query):
+            return set(positive_terms(parse_query(query, tokenize)))
+        if not tokenize(query):
+            return set()
+        return self._query_terms(query)
+
+    def term_offsets(self, position: int, terms: Set[str], column: str) -> List[int]:
+        """Char offsets of the given tokens within one field of one row"""
+        field = TEXT_FIELDS.index(column)
+        starts = []
+        for term in terms:
+            rows = self.postings.get(term)
+            if rows is None:
+                continue
+            k = int(np.searchsorted(rows, position))
+            if k == len(rows) or rows[k] != position:
+                continue
+            offsets = self.occurrence_offsets[term]
+            codes = self.occurrences[term][offsets[k]:offsets[k + 1]]
+            codes = codes[(codes >> FIELD_SHIFT) == field]
+            starts.extend((codes & MAX_POSITION).tolist())
+        return starts
+
+    # -------------------------------------------------------------
+    # Structured queries
+    # -------------------------------------------------------------
+    def evaluate(self, node: Node) -> np.ndarray:
+        """Sorted row positions matching a parsed query tree"""
+        kind = node[0]
+        if kind == "term":
+            _, column, token = node
+            if column is None:
+                return self.postings.get(token, _EMPTY)
+            return self._field_rows(token, column)
+        if kind == "phrase":
+            return self._phrase_rows(node[2], node[1])
+        if kind == "or":
+            return np.unique(np.concatenate([self.evaluate(child) for child in node[1]]))
+        if kind == "not":
+            everything = np.arange(len(self.documents), dtype=np.int64)
+            return np.setdiff1d(everything, self.evaluate(node[1]), assume_unique=True)
+
+        # AND: intersect the positive lists shortest first, then subtract the negated ones
+        children = node[1]
+        positives = [self.evaluate(child) for child in children if child[0] != "not"]
+        if positives:
+            positives.sort(key=len)
+            result = positives[0]
+            for rows in positives[1:]:
+                if len(result) == 0:
+                    break
+                result = intersect_sorted(result, rows)
+        else:
+            result = np.arange(len(self.documents), dtype=np.int64)
+
+        for child in children:
+            if child[0] != "not" or len(result) == 0:
+                continue
+            result = np.setdiff1d(result, self.evaluate(child[1]), assume_unique=True)
+        return result
+
+    def _occurrence_rows(self, token: str, column: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(row, packed occurrence) pairs of a token, optionally within one column"""
+        rows = self.postings.get(token)
+        if rows is None:
+            return _EMPTY, _EMPTY
+        codes = self.occurrences[token]
+        occurrence_rows = np.repeat(rows, np.diff(self.occurrence_offsets[token]))
+        if column is not None:
+            in_field = (codes >> FIELD_SHIFT) == TEXT_FIELDS.index(column)
+            occurrence_rows, codes = occurrence_rows[in_field], codes[in_field]
+        return occurrence_rows, codes
+
+    def _field_rows(self, token: str, column: str) -> np.ndarray:
+        rows, _ = self._occurrence_rows(token, column)
+        return np.unique(rows)
+
+    def _phrase_rows(self, tokens: List[str], column: Optional[str]) -> np.ndarray:
+        """Rows where the tokens occur at consecutive word positions of one field"""
+        lists = sorted((self.postings.get(token, _EMPTY) for token in set(tokens)), key=len)
+        candidates = lists[0]
+        for rows in lists[1:]:
+            if len(candidates) == 0:
+                return candidates
+            candidates = intersect_sorted(candidates, rows)
+
+        # Shift each token's (field, word) key back by its offset in the phrase;
+        # rows where every token lands on the same key contain the phrase.
+        key_span = 1 << (POSITION_BITS + 3)  # room for a 3-bit field above the word
+        matched = None
+        for offset, token in enumerate(tokens):
+            if len(candidates) == 0:
+                break
+            rows, codes = self._occurrence_rows(token, column)
+            keep = np.isin(rows, candidates)
+            keys = rows[keep] * key_span + (codes[keep] >> POSITION_BITS) - offset
+            keys = np.unique(keys)
+            matched = keys if matched is None else np.intersect1d(matched, keys, assume_unique=True)
+            candidates = np.unique(matched // key_span)
+        return candidates
+
+    # -------------------------------------------------------------
+    # Ranking
+    # -------------------------------------------------------------
+    def _top_bm25(self, terms: Set[str], matches: np.ndarray, limit: int) -> np.ndarray:
+        """Score every match and keep the best `limit` with a bounded heap"""
+        if len(matches) == 0:
+            return matches
+
+        total = len(self.documents)
+        scores = np.zeros(len(matches), dtype=np.float64)
+        for term in terms:
+            rows = self.postings.get(term)
+            if rows is None:
+                continue
+            # Align this term's postings with the matched rows
+            idx = np.searchsorted(rows, matches)
+            idx[idx == len(rows)] = len(rows) - 1
+            present = rows[idx] == matches
+            if not present.any():
+                continue
+            tf = self.term_weights[term][idx[present]].astype(np.float64)
+            idf = math.log(1 + (total - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[present] += idf * tf / (BM25_K1 + tf)
+
+        # heapq.nlargest keeps only `limit` entries; ties keep frame order
+        best = heapq.nlargest(limit, range(len(matches)), key=scores.__getitem__)
+        return matches[best]
@@ -0,0 +1,80 @@
+# backend/services/snapshot.py
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from pyarrow import feather
+    ARROW_AVAILABLE = True
+except ImportError:
+    feather = None
+    ARROW_AVAILABLE = False
+
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "data/snapshot")
+
+
+class DatasetSnapshot:
+    """Cleaned review frame persisted as an uncompressed Arrow file plus a JSON sidecar"""
+
+    def __init__(self, directory: str = SNAPSHOT_DIR):
+        self.directory = Path(directory)
+        self.data_path = self.directory / "reviews.arrow"
+        self.meta_path = self.directory / "reviews.meta.json"
+
+    @property
+    def enabled(self) -> bool:
+        return ARROW_AVAILABLE and os.environ.get("DISABLE_SNAPSHOT", "").lower() != "true"
+
+    def load(self) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Memory-map the snapshot; returns (frame, metadata) or None"""
+        if not self.enabled or not self.data_path.exists() or not self.meta_path.exists():
+            return None
+
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            table = feather.read_table(str(self.data_path), memory_map=True)
+            df = table.to_pandas()
+        except Exception as e:
+            print(f"⚠️ Could not read snapshot: {e}")
+            return None
+
+        if len(df) != meta.get("rows"):
+            print("⚠️ Snapshot row count does not match its metadata, ignoring it")
+            return None
+
+        return df, meta
+
+    def save(self, df: pd.DataFrame, fingerprint: Dict[str, Any], **extra) -> bool:
+        """Write the frame and its source fingerprint (atomic rename)"""
+        if not self.enabled or df is None or df.empty:
+            return False
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            data_tmp = self.data_path.with_suffix(".arrow.tmp")
+            df.reset_index(drop=True).to_feather(data_tmp, compression="uncompressed")
+
+            meta = {
+                "fingerprint": fingerprint,
+                "rows": int(len(df)),
+                "saved_at": datetime.utcnow().isoformat(),
+                **extra
+            }
+            meta_tmp = self.meta_path.with_suffix(".json.tmp")
+            with open(meta_tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f, default=str)
+
+            os.replace(data_tmp, self.data_path)
+            os.replace(meta_tmp, self.meta_path)
+            print(f"💽 Saved dataset snapshot ({len(df)} rows) to {self.data_path}")
+            return True
+
+        except Exception as e:
+            print(f"⚠️ Could not write snapshot: {e}")
+            return False
@@ -0,0 +1,57 @@
+# backend/services/snippets.py
+from typing import Any, Dict, List
+
+from services.search_index import TOKEN_RE
+
+
+def make_snippet(text: str, starts: List[int], length: int = 160) -> Dict[str, Any]:
+    """Window of `text` around the densest run of matched words, with highlight spans.
+
+    `starts` are char offsets of matched words (from the positional index), so
+    the text is never searched again; highlights are [start, end) pairs
+    relative to the returned window.
+    """
+    text = "" if text is None else str(text)
+    spans = []
+    for start in sorted(set(starts)):
+        match = TOKEN_RE.match(text, start)
+        if match is not None:
+            spans.append((start, match.end()))
+
+    if not spans:
+        end = _snap_end(text, 0, min(len(text), length))
+        return {"text": text[:end], "start": 0, "end": end, "highlights": []}
+
+    # Two pointers: the window start (a hit) that covers the most hits
+    best_first, best_count, last = 0, 0, 0
+    for first in range(len(spans)):
+        last = max(last, first)
+        while last + 1 < len(spans) and spans[last + 1][1] - spans[first][0] <= length:
+            last += 1
+        if last - first + 1 > best_count:
+            best_first, best_count = first, last - first + 1
+
+    # Lead in with a little context before the first hit
+    hit_start = spans[best_first][0]
+    begin = max(0, hit_start - length // 4)
+    end = min(len(text), begin + length)
+    if begin > 0:
+        space = text.find(" ", begin, hit_start)
+        begin = hit_start if space == -1 else space + 1
+    covered = [stop for start, stop in spans if start >= begin and stop <= end]
+    end = max(_snap_end(text, begin, end), max(covered, default=begin))
+
+    highlights = [
+        [start - begin, stop - begin]
+        for start, stop in spans
+        if start >= begin and stop <= end
+    ]
+    return {"text": text[begin:end], "start": begin, "end": end, "highlights": highlights}
+
+
+def _snap_end(text: str, begin: int, end: int) -> int:
+    """Pull a cut back to the previous space so words are not split"""
+    if end >= len(text):
+        return len(text)
+    space = text.rfind(" ", begin, end + 1)
+    return end if space <= begin else space
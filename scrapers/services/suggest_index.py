@@ -0,0 +1,106 @@
+# backend/services/suggest_index.py
+import bisect
+import heapq
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+from services.text_normalize import normalize_text
+
+
+class SuggestIndex:
+    """Prefix autocomplete over product names, categories and scrape keywords.
+
+    Every word start of every suggestion is a key in one sorted array, so a
+    prefix maps to a contiguous range found by binary search ("gal" finds
+    "Samsung Galaxy S23"). Suggestions in the range are ranked by review count.
+    """
+
+    def __init__(self):
+        self.keys: List[Tuple[str, int]] = []
+        self.suggestions: List[Dict[str, Any]] = []
+        self._by_text: Dict[str, int] = {}
+        # Memoized results for very short prefixes, whose ranges are widest
+        self._short_cache: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+
+    def build(self, df: pd.DataFrame, keywords: List[str]):
+        self.keys, self.suggestions, self._by_text = [], [], {}
+        self._short_cache = {}
+
+        product_counts: Dict[str, int] = {}
+        if df is not None and not df.empty:
+            if "product_name" in df.columns:
+                product_counts = {str(k): int(v) for k, v in df["product_name"].value_counts().items()}
+                for name, count in product_counts.items():
+                    self._add("product", name, count)
+            if "category" in df.columns:
+                for name, count in df["category"].value_counts().items():
+                    self._add("category", str(name), int(count))
+
+        # A keyword is as popular as the products whose names contain it
+        normalized_counts = [(normalize_text(name), c) for name, c in product_counts.items()]
+        for keyword in keywords:
+            needle = normalize_text(keyword)
+            count = sum(c for name, c in normalized_counts if needle in name)
+            self._add("keyword", keyword, count)
+
+        self.keys.sort()
+
+    def _add(self, kind: str, text: str, count: int):
+        normalized = normalize_text(text)
+        if not normalized:
+            return
+        existing = self._by_text.get(normalized)
+        if existing is not None:
+            # Same text under two kinds (e.g. product and keyword): keep one entry
+            suggestion = self.suggestions[existing]
+            suggestion["review_count"] = max(suggestion["review_count"], count)
+            return
+
+        suggestion_id = len(self.suggestions)
+        self.suggestions.append({"text": text, "type": kind, "review_count": count})
+        self._by_text[normalized] = suggestion_id
+
+        words = normalized.split(" ")
+        for start in range(len(words)):
+            self.keys.append((" ".join(words[start:]), suggestion_id))
+
+    def add_review(self, product_name: str, category: str):
+        """Bump counts for an added review, inserting new names in sorted position"""
+        for kind, text in (("product", product_name), ("category", category)):
+            normalized = normalize_text(text)
+            suggestion_id = self._by_text.get(normalized)
+            if suggestion_id is not None:
+                self.suggestions[suggestion_id]["review_count"] += 1
+                continue
+            before = len(self.keys)
+            self._add(kind, str(text), 1)
+            new_keys = self.keys[before:]
+            del self.keys[before:]
+            for key in new_keys:
+                bisect.insort(self.keys, key)
+        self._short_cache = {}
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[Dict[str, Any]]:
+        needle = normalize_text(prefix)
+        if not needle:
+            return []
+
+        cache_key = (needle, limit)
+        if len(needle) <= 2 and cache_key in self._short_cache:
+            return self._short_cache[cache_key]
+
+        start = bisect.bisect_left(self.keys, (needle,))
+        end = bisect.bisect_left(self.keys, (needle + "\uffff",))
+        suggestion_ids = {suggestion_id for _, suggestion_id in self.keys[start:end]}
+
+        suggestions = self.suggestions
+        best = heapq.nlargest(
+            limit, suggestion_ids,
+            key=lambda i: (suggestions[i]["review_count"], -i)
+        )
+        result = [dict(suggestions[i]) for i in best]
+
+        if len(needle) <= 2:
+            self._short_cache[cache_key] = result
+        return result
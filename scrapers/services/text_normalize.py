@@ -0,0 +1,49 @@
+# backend/services/text_normalize.py
+import unicodedata
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Columns that get a normalized shadow copy named <column>_norm
+NORMALIZED_COLUMNS = ["review_text", "product_name", "category", "reviewer", "verified"]
+NORM_SUFFIX = "_norm"
+
+
+def norm_column(column: str) -> str:
+    return column + NORM_SUFFIX
+
+
+def normalize_text(value: Any) -> str:
+    """NFKC, casefolded, whitespace-collapsed form used for case-insensitive matching"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", str(value)).casefold().split())
+
+
+def normalize_series(series: pd.Series) -> pd.Series:
+    """Normalize each distinct value once and broadcast it back to the rows"""
+    codes, uniques = pd.factorize(series)
+    # Missing values get code -1, which picks the trailing ""
+    normalized = np.array([normalize_text(value) for value in uniques] + [""], dtype=object)
+    return pd.Series(normalized[codes], index=series.index)
+
+
+def add_normalized_columns(df: pd.DataFrame, columns: List[str] = NORMALIZED_COLUMNS) -> pd.DataFrame:
+    """Add any missing shadow columns in place (once per load, not per request)"""
+    if df is None:
+        return df
+    for column in columns:
+        if column in df.columns and norm_column(column) not in df.columns:
+            df[norm_column(column)] = normalize_series(df[column])
+    return df
+
+
+def normalized_values(row: Dict[str, Any]) -> Dict[str, str]:
+    """Shadow column values for a single record"""
+    return {norm_column(column): normalize_text(row.get(column)) for column in NORMALIZED_COLUMNS}
+
+
+def without_normalized_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """The frame minus its shadow columns (for persisting to the source)"""
+    return df[[column for column in df.columns if not str(column).endswith(NORM_SUFFIX)]]
@@ -0,0 +1,39 @@
+# tests/conftest.py
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Modules import each other flat (from services.x import ...), as when run from the backend folder
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scrapers")))
+os.environ.setdefault("MONGODB_URI", "none")
+os.environ.setdefault("DISABLE_SNAPSHOT", "true")
+
+
+class FakeCollection:
+    """Just enough of a pymongo collection for add_review"""
+
+    def __init__(self):
+        self.documents = []
+
+    def insert_one(self, document):
+        self.documents.append(document)
+
+        class Result:
+            inserted_id = len(self.documents)
+        return Result()
+
+
+@pytest.fixture
+def make_loader():
+    """A loaded DataLoader over the given frame, with a fake collection for add_review"""
+    from data_loader import DataLoader
+
+    def make(frame: pd.DataFrame) -> DataLoader:
+        loader = DataLoader()
+        loader._install_frame(frame)
+        loader.loaded = True
+        loader.collection = FakeCollection()
+        return loader
+    return make
@@ -0,0 +1,51 @@
+# tests/test_data_loader_stats.py
+import pandas as pd
+import pytest
+
+
+def review_frame(**extra) -> pd.DataFrame:
+    return pd.DataFrame({
+        "review_id": [1, 2, 3],
+        "category": ["Electronics", "Electronics", "Shoes"],
+        "product_name": ["Phone A", "Phone B", "Shoe A"],
+        "rating": [5, 3, 4],
+        "review_text": ["great phone", "okay phone", "comfy shoe"],
+        "reviewer": ["a", "b", "c"],
+        "date": [None, None, None],
+        "verified": ["yes", "no", "yes"],
+        **extra
+    })
+
+
+NEW_REVIEWS = [
+    {"category": "Shoes", "product_name": "Shoe B", "rating": 2, "review_text": "terrible awful shoe",
+     "reviewer": "d", "verified": "no"},
+    {"category": "Shoes", "product_name": "Shoe A", "rating": 4, "review_text": "nice shoe",
+     "reviewer": "f", "verified": "yes"},
+    {"category": "Electronics", "product_name": "Phone A", "rating": 5, "review_text": "excellent wonderful phone",
+     "reviewer": "e", "verified": "yes"},
+]
+
+
+def ordered(value):
+    """Dicts as (key, value) lists, so comparisons also check key order"""
+    if isinstance(value, dict):
+        return [(key, ordered(item)) for key, item in value.items()]
+    return value
+
+
+@pytest.mark.parametrize("frame", [
+    review_frame(),
+    review_frame(sentiment_label=["positive", "neutral", "positive"]),
+], ids=["without_sentiment", "with_sentiment"])
+def test_patched_stats_match_recompute(make_loader, frame):
+    loader = make_loader(frame)
+    loader.get_stats()
+
+    for review in NEW_REVIEWS:
+        assert loader.add_review(dict(review))
+        patched = loader.get_stats()
+        assert ordered(patched) == ordered(loader._compute_stats())
+
+    assert patched["total_reviews"] == len(frame) + len(NEW_REVIEWS)
+    assert "sentiment" in patched
@@ -0,0 +1,126 @@
+# tests/test_pagination.py
+import pandas as pd
+import pytest
+
+CATEGORIES = ["Electronics", "Shoes", "Books"]
+
+FILTERS = [
+    {},
+    {"category": "Shoes"},
+    {"min_rating": 4},
+    {"category": "Electronics", "verified": True},
+]
+
+NEW_REVIEWS = [
+    {"category": "Shoes", "product_name": "Item 9", "rating": 5, "review_text": "new shoe",
+     "reviewer": "x", "verified": "yes"},
+    {"category": "Electronics", "product_name": "Item 8", "rating": 4, "review_text": "new gadget",
+     "reviewer": "y", "verified": "yes"},
+    {"category": "Books", "product_name": "Item 7", "rating": 1, "review_text": "new book",
+     "reviewer": "z", "verified": "no"},
+]
+
+
+def review_frame(ids) -> pd.DataFrame:
+    """Reviews whose ids differ from their positions, so cursors cannot confuse the two"""
+    return pd.DataFrame({
+        "review_id": ids,
+        "category": [CATEGORIES[i % 3] for i in ids],
+        "product_name": [f"Item {i % 4}" for i in ids],
+        "rating": [i % 5 + 1 for i in ids],
+        "review_text": [f"review {i}" for i in ids],
+        "reviewer": [f"user {i}" for i in ids],
+        "date": [None] * len(ids),
+        "verified": ["yes" if i % 2 else "no" for i in ids],
+    })
+
+
+FRAME_IDS = [100 + 7 * i for i in range(23)]
+
+
+def expected_ids(loader, category=None, min_rating=None, verified=None) -> list:
+    """Brute-force filter over the loader's frame, in frame order"""
+    df = loader.df
+    mask = pd.Series(True, index=df.index)
+    if category is not None:
+        mask &= df["category"] == category
+    if min_rating is not None:
+        mask &= df["rating"] >= min_rating
+    if verified is not None:
+        mask &= df["verified"] == ("yes" if verified else "no")
+    return [int(review_id) for review_id in df.loc[mask, "review_id"]]
+
+
+def page_ids(records) -> list:
+    return [int(record["review_id"]) for record in records]
+
+
+def by_cursor(loader, limit, cursor=None, **filters) -> list:
+    ids = []
+    while True:
+        records, cursor = loader.get_reviews_page(limit=limit, cursor=cursor, **filters)
+        ids.extend(page_ids(records))
+        if cursor is None:
+            return ids
+
+
+def by_offset(loader, limit, **filters) -> list:
+    ids, offset = [], 0
+    while True:
+        records, _ = loader.get_reviews_page(limit=limit, offset=offset, **filters)
+        if not records:
+            return ids
+        ids.extend(page_ids(records))
+        offset += limit
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("limit", [1, 4, 7])
+def test_cursor_pages_match_offset_pages(make_loader, filters, limit):
+    loader = make_loader(review_frame(FRAME_IDS))
+    expected = expected_ids(loader, **filters)
+    assert expected
+    assert by_offset(loader, limit, **filters) == expected
+    assert by_cursor(loader, limit, **filters) == expected
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_cursor_continues_after_add_review(make_loader, filters):
+    loader = make_loader(review_frame(FRAME_IDS))
+    first_page, cursor = loader.get_reviews_page(limit=2, **filters)
+    assert cursor is not None
+
+    for review in NEW_REVIEWS:
+        assert loader.add_review(dict(review))
+
+    expected = expected_ids(loader, **filters)
+    assert by_offset(loader, 2, **filters) == expected
+    assert page_ids(first_page) + by_cursor(loader, 2, cursor=cursor, **filters) == expected
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_cursor_reresolved_after_reload(make_loader, filters):
+    loader = make_loader(review_frame(FRAME_IDS))
+    first_page, cursor = loader.get_reviews_page(limit=2, **filters)
+    assert cursor is not None
+    last_id = page_ids(first_page)[-1]
+
+    # Two new reviews in front shift every position the cursor knew about
+    loader._install_frame(review_frame([1, 2] + FRAME_IDS))
+
+    expected = expected_ids(loader, **filters)
+    rest = expected[expected.index(last_id) + 1:]
+    assert by_cursor(loader, 2, cursor=cursor, **filters) == rest
+
+
+def test_cursor_to_a_removed_review(make_loader):
+    loader = make_loader(review_frame(FRAME_IDS))
+    first_page, cursor = loader.get_reviews_page(limit=2)
+    removed = page_ids(first_page)[-1]
+
+    loader._install_frame(review_frame([i for i in FRAME_IDS if i != removed]))
+
+    with pytest.raises(ValueError):
+        loader.get_reviews_page(limit=2, cursor=cursor)
+    with pytest.raises(ValueError):
+        loader.get_reviews_page(limit=2, cursor="not-a-cursor")
@@ -0,0 +1,129 @@
+# tests/test_search_query.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.query_parser import is_structured, parse_query
+from services.search_index import TEXT_FIELDS, SearchIndex, tokenize
+
+
+ROWS = [
+    # review_text, product_name, category, reviewer
+    ("Battery life is great, great phone", "Phone X", "Electronics", "Asha"),
+    ("Great battery. Life changing!", "Phone Y", "Electronics", "Ravi Kumar"),
+    ("life battery great", "Battery Pack", "Electronics", "Asha"),
+    ("Not bad for the price", "Running Shoe", "Shoes", "Kumar"),
+    ("bad fit, returned", "Running Shoe", "Shoes", "Meera"),
+    ("Comfy and light", "Walking Shoe", "Shoes", "Ravi"),
+    ("great sound, battery okay", "Earphones Pro", "Electronics", "Meera"),
+    ("Phone", "Battery", "Life", "Great"),
+]
+
+QUERIES = [
+    # precedence: OR binds loosest, then (implicit) AND, then NOT
+    "great battery OR shoe",
+    "great AND battery OR bad AND fit",
+    "great (battery OR sound)",
+    "NOT battery OR shoe",
+    "NOT NOT battery",
+    # NOT-only and negated groups
+    "NOT great",
+    "NOT (great OR bad)",
+    "shoe NOT bad",
+    # field scoping
+    "product:phone",
+    "reviewer:kumar",
+    "category:shoes NOT reviewer:ravi",
+    "text:battery product:phone",
+    "product:battery OR reviewer:great",
+    # phrases: consecutive words of one field, never across fields
+    '"battery life"',
+    '"great battery"',
+    '"life battery"',
+    '"phone battery"',
+    'text:"great phone"',
+    'product:"running shoe" OR "comfy and light"',
+    "wi-fi OR great-battery",
+]
+
+
+def frame(rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=TEXT_FIELDS)
+
+
+def brute_force(node, row) -> bool:
+    """Evaluate a query tree on one row by scanning its tokens"""
+    kind = node[0]
+    if kind in ("term", "phrase"):
+        words = [node[2]] if kind == "term" else node[2]
+        columns = [node[1]] if node[1] else TEXT_FIELDS
+        for column in columns:
+            tokens = tokenize(row[TEXT_FIELDS.index(column)])
+            if any(tokens[i:i + len(words)] == words for i in range(len(tokens))):
+                return True
+        return False
+    if kind == "not":
+        return not brute_force(node[1], row)
+    results = [brute_force(child, row) for child in node[1]]
+    return all(results) if kind == "and" else any(results)
+
+
+def expected_rows(query, rows) -> list:
+    node = parse_query(query, tokenize)
+    return [position for position, row in enumerate(rows) if brute_force(node, row)]
+
+
+def test_parse_precedence():
+    assert parse_query("great battery OR shoe", tokenize) == (
+        "or", [("and", [("term", None, "great"), ("term", None, "battery")]), ("term", None, "shoe")]
+    )
+    assert parse_query("NOT battery great", tokenize) == (
+        "and", [("not", ("term", None, "battery")), ("term", None, "great")]
+    )
+    assert parse_query("great (battery OR sound)", tokenize) == (
+        "and", [("term", None, "great"), ("or", [("term", None, "battery"), ("term", None, "sound")])]
+    )
+
+
+def test_parse_fields_and_phrases():
+    assert parse_query('product:"Running Shoe"', tokenize) == ("phrase", "product_name", ["running", "shoe"])
+    assert parse_query("Reviewer:Kumar", tokenize) == ("term", "reviewer", "kumar")
+    assert parse_query("wi-fi AND", tokenize) == ("phrase", None, ["wi", "fi"])
+    assert parse_query("NOT", tokenize) is None
+
+
+@pytest.mark.parametrize("query, structured", [
+    ("battery life", False),
+    ("not bad", False),
+    ("NOT bad", True),
+    ('"battery life"', True),
+    ("product:phone", True),
+    ("ratio:1", False),
+])
+def test_is_structured(query, structured):
+    assert is_structured(query) == structured
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_evaluate_matches_brute_force(query):
+    index = SearchIndex()
+    index.build(frame(ROWS))
+    assert index.search(query, limit=len(ROWS)).tolist() == expected_rows(query, ROWS)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_evaluate_after_appends(query):
+    # The last rows go through add_row (the buffered per-token arrays)
+    index = SearchIndex()
+    index.build(frame(ROWS[:3]))
+    for position, values in enumerate(ROWS[3:], start=3):
+        index.add_row(position, dict(zip(TEXT_FIELDS, values)))
+    assert index.search(query, limit=len(ROWS)).tolist() == expected_rows(query, ROWS)
+
+
+def test_bm25_ranks_only_matches():
+    index = SearchIndex()
+    index.build(frame(ROWS))
+    ranked = index.search("battery NOT phone", limit=len(ROWS), rank="bm25")
+    assert sorted(ranked.tolist()) == expected_rows("battery NOT phone", ROWS)
+    assert len(np.unique(ranked)) == len(ranked)